@@ -11,6 +11,10 @@ from PyQt6.QtGui import QPixmap, QIcon
 from PyQt6.QtCore import Qt, QTimer
 
 from app.utils.paths import resource_path
+from app.utils.watcher import get_watch_service
+from app.utils.staging import get_purger
+from app.utils.retry_queue import run_pending
+from app.utils.journal import resume_unfinished
 
 # Version + updater
 try:
@@ -63,6 +67,14 @@ class MainWindow(QWidget):
 
         self._build_ui()
 
+        # Keep target sizes live while the app is open
+        self.watcher = get_watch_service()
+        self.watcher.start()
+
+        # Finish purges / deletes an earlier session didn't get to
+        get_purger().purge_leftovers()
+        threading.Thread(target=self._finish_interrupted_work, daemon=True).start()
+
         # Update check (non-blocking)
         QTimer.singleShot(900, self.start_update_check)
 
@@ -236,6 +248,17 @@ class MainWindow(QWidget):
             if nm in self._page_buttons:
                 self._page_buttons[nm].setChecked(True)
 
+    def _finish_interrupted_work(self):
+        # Background thread: cleans killed mid-way, then files left locked
+        resume_unfinished()
+        run_pending()
+
+    def closeEvent(self, event):
+        # Stop background scans / cleans so they don't outlive the window
+        self.cleaning_page.stop_all()
+        self.watcher.stop()
+        super().closeEvent(event)
+
     # ------------------------------------------------------------------
     # Update checker (GitHub Releases)
     # ------------------------------------------------------------------
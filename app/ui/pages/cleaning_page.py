@@ -1,15 +1,28 @@
 import os
-import shutil
 import threading
+import time
 
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit, QComboBox, QCheckBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import pyqtSignal
 
 from app.ui.widgets.cards import Card
 from app.ui.widgets.buttons import PrimaryButton, SecondaryButton
-from app.utils.systeminfo import folder_size
+from app.ui.widgets.largest_dialog import LargestItemsDialog
+from app.utils.cancel import CancelToken
+from app.utils.deleter import describe_failures
+from app.utils.clean_plan import (
+    build_plan, execute_target, record_clean,
+    describe_policy, SHADER_POLICY, TEMP_POLICY
+)
+from app.utils.staging import clean_instant
+from app.utils.retry_queue import retry_failures, RETRY_BUDGET
+from app.utils.journal import get_journal
+from app.utils.archiver import archive_plans
+from app.utils.throttle import get_throttle
+from app.utils.scan_service import get_scan_service
+from app.utils.scanner import new_result
 
 
 def format_bytes(num: int):
@@ -21,25 +34,57 @@ def format_bytes(num: int):
     return f"{num:.2f} TB"
 
 
+# Seconds a preview plan is reused by Clean All before planning again
+PLAN_MAX_AGE = 300
+
+
 class CleaningPage(QWidget):
     """
     Full Cleaning Page (FiveM cache, logs, shaders, Windows temp)
     PRO — No conflicts with Troubleshooter.
     """
 
+    # (expanded path, scan result or None on error) — emitted from scan threads
+    size_ready = pyqtSignal(str, object)
+    # throttled scan progress event — emitted from scan threads
+    scan_progress = pyqtSignal(object)
+    # log lines from the cleaning thread
+    log_ready = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
 
-        # All paths handled here
-        self.paths = {
-            "FiveM Cache": r"%localappdata%\FiveM\FiveM.app\data\cache",
-            "FiveM Logs": r"%localappdata%\FiveM\FiveM.app\logs",
-            "GTA V Shader Cache": r"%localappdata%\Rockstar Games\GTA V\Shaders",
-            "Windows Temp": r"%temp%",
+        # Targets and sizes come from the shared scan service (splash
+        # results are reused); one subscription delivers every result
+        self.service = get_scan_service()
+
+        # Emptied by rename-to-staging; contents purged in the background
+        self.instant = {"FiveM Cache"}
+
+        # Streamed into a compressed archive before deleting (evidence for
+        # server staff); toggled by the checkbox
+        self.archived = {"FiveM Logs"}
+
+        # Selective cleaning (see clean_plan); other targets are emptied
+        self.policies = {
+            "Shader Cache": SHADER_POLICY,
+            "Windows Temp": TEMP_POLICY,
         }
 
         self.labels = {}
+        self.sizes = {}
+        self.scans = {}   # name -> last scan result (for the drill-down)
+        self.detail_buttons = {}
+        self.clean_token = None
+        self.plan = None  # last preview (CleanPlan), reused by Clean All
+
+        self.size_ready.connect(self.on_size_ready)
+        self.service.subscribe(self.size_ready.emit)
+        self.scan_progress.connect(self.on_scan_progress)
+        self.service.subscribe_progress(self.scan_progress.emit)
+
         self.build_ui()
+        self.log_ready.connect(self.log.append)
         self.refresh_sizes_async()
 
     # -------------------------------------------------------------
@@ -68,11 +113,22 @@ class CleaningPage(QWidget):
         header.setStyleSheet("font-size: 16px; color: white; font-weight: 600;")
         summary_layout.addWidget(header)
 
-        for name in self.paths.keys():
+        for name in self.service.targets:
+            row = QHBoxLayout()
+
             lbl = QLabel(f"{name}: scanning…")
             lbl.setStyleSheet("color: #cbd5e1; font-size: 14px;")
-            summary_layout.addWidget(lbl)
+            row.addWidget(lbl)
+            row.addStretch()
+
+            details_btn = SecondaryButton("Largest items")
+            details_btn.setEnabled(False)
+            details_btn.clicked.connect(lambda _, n=name: self.show_largest(n))
+            row.addWidget(details_btn)
+
+            summary_layout.addLayout(row)
             self.labels[name] = lbl
+            self.detail_buttons[name] = details_btn
 
         self.total_label = QLabel("Total Recoverable Space: scanning…")
         self.total_label.setStyleSheet("color: #38bdf8; font-size: 15px;")
@@ -92,15 +148,48 @@ class CleaningPage(QWidget):
 
         row = QHBoxLayout()
         clean_btn = PrimaryButton("Clean All")
+        preview_btn = SecondaryButton("Preview Clean")
         rescan_btn = SecondaryButton("Rescan Sizes")
+        stop_btn = SecondaryButton("Stop")
 
         clean_btn.clicked.connect(self.clean_all_async)
-        rescan_btn.clicked.connect(self.refresh_sizes_async)
+        preview_btn.clicked.connect(self.preview_async)
+        rescan_btn.clicked.connect(lambda: self.refresh_sizes_async(force=True))
+        stop_btn.clicked.connect(self.stop_all)
 
         row.addWidget(clean_btn)
+        row.addWidget(preview_btn)
         row.addWidget(rescan_btn)
+        row.addWidget(stop_btn)
         actions_layout.addLayout(row)
 
+        # I/O throttle (token-bucket limits on scans and deletes)
+        throttle_row = QHBoxLayout()
+        throttle_label = QLabel("Disk usage while cleaning:")
+        throttle_label.setStyleSheet("color: #cbd5e1; font-size: 14px;")
+
+        self.throttle_box = QComboBox()
+        self.throttle_box.addItem("Auto — slow down while FiveM / GTA V runs", "auto")
+        self.throttle_box.addItem("Always gentle", "on")
+        self.throttle_box.addItem("Full speed", "off")
+        self.throttle_box.setCurrentIndex(self.throttle_box.findData(get_throttle().mode))
+        self.throttle_box.currentIndexChanged.connect(
+            lambda i: get_throttle().set_mode(self.throttle_box.itemData(i))
+        )
+
+        throttle_row.addWidget(throttle_label)
+        throttle_row.addWidget(self.throttle_box)
+        throttle_row.addStretch()
+        actions_layout.addLayout(throttle_row)
+
+        self.archive_box = QCheckBox("Archive FiveM logs before deleting them")
+        self.archive_box.setStyleSheet("color: #cbd5e1; font-size: 14px;")
+        self.archive_box.setChecked("FiveM Logs" in self.archived)
+        self.archive_box.toggled.connect(
+            lambda on: (self.archived.add if on else self.archived.discard)("FiveM Logs")
+        )
+        actions_layout.addWidget(self.archive_box)
+
         layout.addWidget(actions_card)
 
         # -------------------------------------------------------------
@@ -134,60 +223,271 @@ class CleaningPage(QWidget):
     # THREAD-SAFE UI LOGGING
     # -------------------------------------------------------------
     def log_msg(self, msg: str):
-        self.log.append(msg)
+        self.log_ready.emit(msg)
 
     # -------------------------------------------------------------
     # ASYNC SIZE SCAN
     # -------------------------------------------------------------
-    def refresh_sizes_async(self):
-        threading.Thread(target=self.refresh_sizes, daemon=True).start()
-
-    def refresh_sizes(self):
-        total = 0
+    def refresh_sizes_async(self, force=False):
+        """
+        Asks the scan service for every target. Fresh results are reused
+        unless force=True (Rescan button, a user scan: it runs under the
+        I/O throttle).
+
+        Finished scans reach the page through its service subscription;
+        only cached results (no scan, so no notification) and failed
+        scans are emitted here.
+        """
+        max_age = 0 if force else None
+
+        for name in self.service.targets:
+            path = self.service.path_for(name)
+            cached = self.service.cached(path, max_age)
+            if cached is not None:
+                self.size_ready.emit(path, cached)
+                continue
+            fut = self.service.scan(path, max_age, throttled=force)
+            fut.add_done_callback(lambda f, p=path: self._on_scan_done(p, f))
+
+    def _on_scan_done(self, path, fut):
+        if fut.exception() is not None:
+            self.size_ready.emit(path, None)
+
+    def _name_for(self, path):
+        for name in self.service.targets:
+            if self.service.path_for(name) == path:
+                return name
+        return None
+
+    def on_scan_progress(self, event):
+        name = self._name_for(event["root"])
+        if name is None or event["done"]:
+            return
+
+        self.labels[name].setText(
+            f"{name}: scanning… {event['files']:,} files ({format_bytes(event['bytes'])})"
+        )
+
+    def on_size_ready(self, path, scan):
+        name = self._name_for(path)
+        if name is None:
+            return
+
+        if scan is None:
+            text = f"{name}: error scanning"
+            self.sizes.pop(name, None)
+            self.scans.pop(name, None)
+        elif not os.path.exists(path):
+            text = f"{name}: not found"
+            self.sizes[name] = 0
+            self.scans.pop(name, None)
+        else:
+            text = f"{name}: {format_bytes(scan['bytes'])} ({scan['files']} files)"
+            if scan.get("partial"):
+                text += " — scan stopped early, at least this much"
+            self.sizes[name] = scan["bytes"]
+            self.scans[name] = scan
+
+        self.labels[name].setText(text)
+        self.detail_buttons[name].setEnabled(name in self.scans)
+
+        total = sum(self.sizes.values())
+        self.total_label.setText(f"Total Recoverable Space: {format_bytes(total)}")
 
-        for name, path in self.paths.items():
-            expanded = os.path.expandvars(path)
+    def show_largest(self, name):
+        """
+        Opens the largest files / folders of one target (from its last scan).
+        """
+        scan = self.scans.get(name)
+        if scan is None:
+            return
+        LargestItemsDialog(name, scan, self).exec()
 
-            if os.path.exists(expanded):
-                try:
-                    size = folder_size(expanded)
-                    total += size
-                    text = f"{name}: {format_bytes(size)}"
-                except Exception:
-                    text = f"{name}: error scanning"
-            else:
-                text = f"{name}: not found"
+    # -------------------------------------------------------------
+    # ASYNC CLEAN ALL
+    # -------------------------------------------------------------
+    def clean_all_async(self):
+        self.clean_token = CancelToken()
+        threading.Thread(target=self.clean_all, args=(self.clean_token,), daemon=True).start()
 
-            self.labels[name].setText(text)
+    def stop_all(self):
+        """
+        Stops a running clean and any size scans (app close / Stop button).
+        """
+        if self.clean_token:
+            self.clean_token.cancel()
+        self.service.cancel_all()
 
-        self.total_label.setText(f"Total Recoverable Space: {format_bytes(total)}")
+    def _expanded_paths(self):
+        return {name: self.service.path_for(name) for name in self.service.targets}
 
     # -------------------------------------------------------------
-    # ASYNC CLEAN ALL
+    # PREVIEW (DRY RUN)
     # -------------------------------------------------------------
-    def clean_all_async(self):
-        threading.Thread(target=self.clean_all, daemon=True).start()
+    def preview_async(self):
+        self.clean_token = CancelToken()
+        threading.Thread(target=self.preview, args=(self.clean_token,), daemon=True).start()
+
+    def preview(self, token=None):
+        """
+        Builds a clean plan (one walk, nothing deleted) and logs what
+        Clean All would free. Clean All then runs this exact plan, unless
+        the preview was stopped early (it only covers part of the folders).
+        """
+        self.log_msg("🔎 Preview — nothing will be deleted…")
+        plan = build_plan(self._expanded_paths(), token, self.policies)
+
+        for target in plan.targets:
+            if not os.path.exists(target.path):
+                self.log_msg(f"{target.label}: path not found.")
+                continue
 
-    def clean_all(self):
+            msg = f"{target.label}: would free {format_bytes(target.bytes)} ({target.files:,} files)"
+            if target.label in self.policies:
+                msg += f" [{describe_policy(self.policies[target.label])}]"
+            if target.skipped:
+                reasons = ", ".join(f"{n} {r}" for r, n in target.skip_reasons().items())
+                msg += f", would skip {len(target.skipped):,} ({reasons})"
+            in_use_files, in_use_bytes = target.in_use()
+            if in_use_files:
+                msg += f", {format_bytes(in_use_bytes)} skipped (in use)"
+            if target.partial:
+                msg += " — preview stopped early"
+            self.log_msg(msg + ".")
+
+        if any(t.partial for t in plan.targets):
+            self.log_msg(f"Total so far: {format_bytes(plan.bytes)}. Preview stopped early — "
+                         "Clean All will plan again.\n")
+            self.plan = None
+            return
+
+        self.log_msg(f"Total: {format_bytes(plan.bytes)} can be freed. Press Clean All to run this plan.\n")
+        self.plan = plan
+
+    # -------------------------------------------------------------
+    # CLEAN
+    # -------------------------------------------------------------
+    def clean_all(self, token=None):
+        """
+        Plans (or reuses the preview), deletes, retries locked files and
+        then publishes exact before/after sizes worked out from the plan
+        and the delete results — no second walk to refresh the numbers.
+        """
         self.log_msg("🧹 Starting cleanup…")
+        total = 0
+        staged = 0  # bytes moved out by instant cleans (purged in the background)
+        done = []   # (target, delete result)
+
+        # Resolved once for the whole clean (game detection is a process sweep)
+        limiter = get_throttle().current()
+        if limiter:
+            self.log_msg("🐢 Game running (or gentle mode on) — cleaning at reduced disk speed.")
+
+        # Reuse a recent, complete preview; otherwise plan now (the only walk either way)
+        plan, self.plan = self.plan, None
+        if plan is None or time.time() - plan.created > PLAN_MAX_AGE or \
+                any(t.partial for t in plan.targets):
+            plan = build_plan(self._expanded_paths(), token, self.policies)
+
+        for target in plan.targets:
+            name = target.label
 
-        for name, path in self.paths.items():
-            expanded = os.path.expandvars(path)
+            if token and token.cancelled:
+                self.log_msg("⏹ Cleanup stopped — remaining folders were not touched.")
+                break
 
-            if not os.path.exists(expanded):
+            if not os.path.exists(target.path):
                 self.log_msg(f"{name}: path not found, skipping.")
                 continue
 
-            removed = 0
-            for root, dirs, files in os.walk(expanded):
-                for f in files:
-                    try:
-                        os.remove(os.path.join(root, f))
-                        removed += 1
-                    except Exception:
-                        pass
+            if name in self.instant and clean_instant(
+                target.path, lambda r, n=name: self._on_purged(n, r)
+            ):
+                # The whole folder was moved out, skipped files included
+                size = target.bytes + target.skipped_bytes
+                staged += size
+                self.log_msg(f"{name}: emptied instantly ({format_bytes(size)}), "
+                             "old files are being purged in the background.")
+                self.service.publish(target.path, new_result(target.path))
+                continue
 
-            self.log_msg(f"{name}: removed {removed} files.")
+            # Only what made it into the archive is deleted
+            if name in self.archived:
+                try:
+                    summary, (target,) = archive_plans([target], token=token, limiter=limiter)
+                except Exception as e:
+                    self.log_msg(f"   ⚠ {name}: archiving failed ({e}) — nothing was deleted.")
+                    continue
+                if summary["archive"]:
+                    self.log_msg(
+                        f"{name}: archived {summary['files']:,} files "
+                        f"({format_bytes(summary['bytes'])} → {format_bytes(summary['compressed'])}) "
+                        f"to {summary['archive']}."
+                    )
+                if summary["evicted"]:
+                    self.log_msg(f"   {name}: removed {len(summary['evicted'])} oldest archive(s) to stay under the size cap.")
+
+            result = execute_target(target, token=token, journal=get_journal(), limiter=limiter)
+            done.append((target, result))
+
+            msg = (f"{name}: removed {result['files']:,} files, "
+                   f"{result['dirs']:,} folders ({format_bytes(result['bytes'])})")
+            if result["in_use"]:
+                msg += f", {format_bytes(result['in_use'])} skipped (in use)"
+            if result["partial"]:
+                msg += " — stopped early (partial)"
+            self.log_msg(msg + ".")
+
+            failures = describe_failures(result)
+            if failures:
+                self.log_msg(f"   ⚠ {name}: could not delete {failures}.")
+            if target.skipped:
+                reasons = ", ".join(f"{n} {r}" for r, n in target.skip_reasons().items())
+                self.log_msg(f"   {name}: left {len(target.skipped):,} files alone ({reasons}).")
+
+        results = [result for _, result in done]
+
+        # Locked files: retry with backoff, then leave them for the next start
+        locked = sum(r["failed"]["locked"] for r in results)
+        if locked and not (token and token.cancelled):
+            self.log_msg(f"🔁 Retrying {locked:,} locked files (up to {RETRY_BUDGET:.0f}s)…")
+            summary = retry_failures(results, token=token)
+
+            msg = f"   Deleted {summary['files']:,} of them ({format_bytes(summary['bytes'])})."
+            if summary["still_locked"]:
+                msg += (f" {len(summary['still_locked']):,} still locked — they will be"
+                        " deleted the next time the app starts.")
+            self.log_msg(msg)
+
+        # Exact new sizes from the plan + results; only partial runs rescan
+        for target, result in done:
+            total += result["bytes"]
+            totals = record_clean(target, result)
+            if totals is None:
+                self.service.scan(target.path, max_age=0, throttled=True)
+                continue
 
-        self.log_msg("✔ Cleanup complete.\n")
-        self.refresh_sizes_async()
+            self.service.publish(target.path, totals["after"])
+            self.log_msg(
+                f"   {target.label}: {format_bytes(totals['before']['bytes'])} → "
+                f"{format_bytes(totals['after']['bytes'])} "
+                f"({format_bytes(totals['reclaimed'])} reclaimed)"
+            )
+
+        in_use = sum(r["in_use"] for r in results)
+        total += staged
+        msg = f"✔ Cleanup complete — {format_bytes(total)} reclaimed"
+        if staged:
+            msg += f" ({format_bytes(staged)} of it emptied instantly)"
+        if in_use:
+            msg += f", {format_bytes(in_use)} skipped (in use)"
+        self.log_msg(msg + ".\n")
+
+    def _on_purged(self, name, result):
+        # Runs on the purge thread
+        msg = (f"{name}: background purge finished — {result['files']:,} files "
+               f"({format_bytes(result['bytes'])}) reclaimed.")
+        failures = describe_failures(result)
+        if failures:
+            msg += f" Could not delete {failures}."
+        self.log_msg(msg)
@@ -1,10 +1,11 @@
 from PyQt6.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 from app.ui.widgets.cards import Card
 from app.ui.widgets.buttons import PrimaryButton, SecondaryButton
+from app.utils.scan_service import get_scan_service
 
 
 def format_bytes(num: int):
@@ -21,16 +22,33 @@ class DashboardPage(QWidget):
     MAIN DASHBOARD PAGE
     Shows:
     - Quick Actions (Scan / Clean)
-    - Storage Summary (from splash pre-scan)
+    - Storage Summary (from splash pre-scan, kept live by the scan service)
     - Scan & Cleaning Log
     """
 
+    # (expanded path, scan result) — emitted from scan threads
+    size_ready = pyqtSignal(str, object)
+    # throttled scan progress event — emitted from scan threads
+    scan_progress = pyqtSignal(object)
+
     def __init__(self, storage_info):
         super().__init__()
 
-        self.storage_info = storage_info or {}
+        self.storage_info = dict(storage_info or {})
+        self.size_labels = {}
+
+        self.service = get_scan_service()
+        self.size_ready.connect(self.on_size_ready)
+        self.service.subscribe(self.size_ready.emit)
+        self.scan_progress.connect(self.on_scan_progress)
+        self.service.subscribe_progress(self.scan_progress.emit)
+
         self.build_ui()
 
+        # Finish any target the splash only measured partially (fresh
+        # results are reused, so this is free after a complete startup scan)
+        self.service.scan_all()
+
     # -------------------------------------------------------
     # BUILD UI
     # -------------------------------------------------------
@@ -91,26 +109,22 @@ class DashboardPage(QWidget):
         header.setStyleSheet("font-size: 16px; color: white; font-weight: 600;")
         storage_layout.addWidget(header)
 
-        if self.storage_info:
-            for name, size in self.storage_info.items():
-                if name == "Total":
-                    continue
-                row = QLabel(f"{name}: {format_bytes(size)}")
-                row.setStyleSheet("color: #cbd5e1; font-size: 14px;")
-                storage_layout.addWidget(row)
-
-            total = self.storage_info.get("Total", 0)
-            total_label = QLabel(
-                f"<b>Total Recoverable Space:</b> {format_bytes(total)}"
-            )
-            total_label.setStyleSheet(
-                "color: #38bdf8; font-size: 16px; margin-top: 6px;"
-            )
-            storage_layout.addWidget(total_label)
-        else:
-            empty_msg = QLabel("No storage data loaded (run a scan).")
-            empty_msg.setStyleSheet("color: #7a8699; font-size: 14px;")
-            storage_layout.addWidget(empty_msg)
+        for name in self.service.targets:
+            if name in self.storage_info:
+                text = f"{name}: {format_bytes(self.storage_info[name])}"
+            else:
+                text = f"{name}: not scanned yet"
+            row = QLabel(text)
+            row.setStyleSheet("color: #cbd5e1; font-size: 14px;")
+            storage_layout.addWidget(row)
+            self.size_labels[name] = row
+
+        self.total_label = QLabel()
+        self.total_label.setStyleSheet(
+            "color: #38bdf8; font-size: 16px; margin-top: 6px;"
+        )
+        storage_layout.addWidget(self.total_label)
+        self.update_total()
 
         layout.addWidget(storage_card)
 
@@ -140,16 +154,47 @@ class DashboardPage(QWidget):
         layout.addWidget(log_card)
         layout.addStretch()
 
+    # -------------------------------------------------------
+    # LIVE STORAGE SUMMARY
+    # -------------------------------------------------------
+    def update_total(self):
+        total = sum(v for k, v in self.storage_info.items() if k != "Total")
+        self.storage_info["Total"] = total
+        self.total_label.setText(
+            f"<b>Total Recoverable Space:</b> {format_bytes(total)}"
+        )
+
+    def on_scan_progress(self, event):
+        if event["done"]:
+            return
+
+        for name in self.service.targets:
+            if self.service.path_for(name) == event["root"]:
+                self.size_labels[name].setText(
+                    f"{name}: scanning… {event['files']:,} files ({format_bytes(event['bytes'])})"
+                )
+
+    def on_size_ready(self, path, scan):
+        for name in self.service.targets:
+            if self.service.path_for(name) != path:
+                continue
+
+            self.storage_info[name] = scan["bytes"]
+            text = f"{name}: {format_bytes(scan['bytes'])}"
+            if scan.get("partial"):
+                text += " (partial — scan stopped early)"
+            self.size_labels[name].setText(text)
+            self.update_total()
+
     # -------------------------------------------------------
     # ACTION HANDLERS
     # (Hook these into your real cleaning system later)
     # -------------------------------------------------------
 
     def scan_all(self):
-        self.log_box.append("🔍 Scanning FiveM Cache...")
-        self.log_box.append("🔍 Scanning GTA Shader Cache...")
-        self.log_box.append("🔍 Scanning Windows Temp...")
-        self.log_box.append("✔ Scan complete!\n")
+        self.log_box.append("🔍 Scanning all targets...")
+        self.service.scan_all(max_age=0, throttled=True)
+        self.log_box.append("✔ Scan started — sizes update as each folder finishes.\n")
 
     def clean_everything(self):
         self.log_box.append("🧹 Cleaning FiveM Cache...")
@@ -1,14 +1,28 @@
 # app/ui/pages/quicktools_page.py
 
 import os
+import re
+import threading
+import time
 import webbrowser
 
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit, QLineEdit
 )
+from PyQt6.QtCore import pyqtSignal
 
 from app.ui.widgets.cards import Card
 from app.ui.widgets.buttons import PrimaryButton, SecondaryButton
+from app.ui.widgets.log_viewer import LogViewerDialog
+from app.utils.log_analysis import analyze_logs, LOG_DIR
+from app.utils.log_tail import current_log
+from app.utils.log_search import search_logs
+
+# Signatures listed per kind in the log analysis report
+REPORT_TOP = 8
+
+# Search hits printed to the log area
+SEARCH_SHOWN = 50
 
 
 class QuickToolsPage(QWidget):
@@ -17,12 +31,22 @@ class QuickToolsPage(QWidget):
     - Open common folders (FiveM, logs, temp)
     - Launch FiveM / Steam
     - Open Discord / Itch.io links
+    - Analyze FiveM logs (error / warning signatures)
+    - View / follow the current FiveM log
+    - Search logs and crash reports (regex, trigram index)
     No duplicated cleaning / troubleshooting processes.
     """
 
+    # log lines from worker threads
+    log_ready = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
+        self.analyzing = False
+        self.searching = False
+        self.viewer = None
         self.build_ui()
+        self.log_ready.connect(self.log.append)
 
     # ---------------------------------------------------------
     # BUILD UI
@@ -92,6 +116,48 @@ class QuickToolsPage(QWidget):
         launch_layout.addLayout(row2)
         layout.addWidget(launch_card)
 
+        # ============================================================== #
+        # LOG ANALYSIS
+        # ============================================================== #
+        analysis_card = Card()
+        analysis_layout = QVBoxLayout(analysis_card)
+
+        header_logs = QLabel("FiveM Log Analysis")
+        header_logs.setStyleSheet("font-size: 16px; color: white; font-weight: 600;")
+        analysis_layout.addWidget(header_logs)
+
+        row_logs = QHBoxLayout()
+        analyze_btn = PrimaryButton("Analyze FiveM Logs")
+        analyze_btn.clicked.connect(self.analyze_logs_async)
+        row_logs.addWidget(analyze_btn)
+
+        view_btn = SecondaryButton("View Current Log")
+        view_btn.clicked.connect(self.open_log_viewer)
+        row_logs.addWidget(view_btn)
+        analysis_layout.addLayout(row_logs)
+
+        row_search = QHBoxLayout()
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search logs and crash reports (regex), e.g. esx_policejob")
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                background-color: #0b1120;
+                color: #d0d8e8;
+                border: 1px solid #1e293b;
+                border-radius: 6px;
+                padding: 8px;
+                font-size: 13px;
+            }
+        """)
+        self.search_box.returnPressed.connect(self.search_logs_async)
+        row_search.addWidget(self.search_box)
+
+        search_btn = SecondaryButton("Search")
+        search_btn.clicked.connect(self.search_logs_async)
+        row_search.addWidget(search_btn)
+        analysis_layout.addLayout(row_search)
+        layout.addWidget(analysis_card)
+
         # ============================================================== #
         # USEFUL LINKS
         # ============================================================== #
@@ -165,6 +231,103 @@ class QuickToolsPage(QWidget):
         else:
             self.log_msg(f"❌ Folder not found: {resolved}")
 
+    def open_log_viewer(self):
+        path = current_log()
+        if path is None:
+            self.log_msg(f"❌ No FiveM log found in {os.path.expandvars(LOG_DIR)}")
+            return
+
+        try:
+            self.viewer = LogViewerDialog(path, self)
+        except (OSError, ValueError) as e:
+            self.log_msg(f"⚠ Could not open log: {path}\n{e}")
+            return
+        self.viewer.show()
+        self.log_msg(f"📄 Opened log viewer: {path}")
+
+    def analyze_logs_async(self):
+        if self.analyzing:
+            return
+        self.analyzing = True
+        threading.Thread(target=self.analyze_logs, daemon=True).start()
+
+    def analyze_logs(self):
+        """
+        Runs on a worker thread; unchanged log files come from the cache.
+        """
+        try:
+            folder = os.path.expandvars(LOG_DIR)
+            if not os.path.isdir(folder):
+                self.log_ready.emit(f"❌ Folder not found: {folder}")
+                return
+
+            self.log_ready.emit("🔎 Analyzing FiveM logs…")
+            started = time.perf_counter()
+            report = analyze_logs(folder)
+            elapsed = time.perf_counter() - started
+
+            self.log_ready.emit(
+                f"Scanned {report['files']} log files ({report['bytes'] / 1024 / 1024:.1f} MB, "
+                f"{report['parsed']} read, rest cached) in {elapsed:.1f}s."
+            )
+            if not report["signatures"]:
+                self.log_ready.emit("✔ No errors or warnings found.\n")
+                return
+
+            for kind in ("script error", "error", "warning"):
+                found = [s for s in report["signatures"] if s["kind"] == kind]
+                if not found:
+                    continue
+                total = sum(s["count"] for s in found)
+                self.log_ready.emit(f"\n{kind.capitalize()}s: {total:,} in {len(found)} distinct signatures")
+                for sig in found[:REPORT_TOP]:
+                    last = time.strftime("%Y-%m-%d %H:%M", time.localtime(sig["last_seen"]))
+                    self.log_ready.emit(
+                        f"   {sig['count']:>6,}×  {sig['signature']}  "
+                        f"({sig['files']} log(s), last {last})"
+                    )
+            self.log_ready.emit("")
+        except Exception as e:
+            self.log_ready.emit(f"⚠ Log analysis failed: {e}")
+        finally:
+            self.analyzing = False
+
+    def search_logs_async(self):
+        pattern = self.search_box.text().strip()
+        if not pattern or self.searching:
+            return
+        self.searching = True
+        threading.Thread(target=self.search_logs, args=(pattern,), daemon=True).start()
+
+    def search_logs(self, pattern):
+        """
+        Runs on a worker thread; new or changed files are indexed first.
+        """
+        try:
+            self.log_ready.emit(f"🔎 Searching for: {pattern}")
+            try:
+                result = search_logs(pattern)
+            except re.error as e:
+                self.log_ready.emit(f"❌ Invalid search pattern: {e}\n")
+                return
+
+            msg = (f"{result['matched_files']} of {result['files']} files match "
+                   f"({result['candidates']} checked"
+                   + (f", {result['indexed']} newly indexed" if result["indexed"] else "")
+                   + f") in {result['elapsed']:.2f}s.")
+            self.log_ready.emit(msg)
+
+            for path, line_no, text in result["matches"][:SEARCH_SHOWN]:
+                self.log_ready.emit(f"   {os.path.basename(path)}:{line_no}: {text}")
+            shown = min(len(result["matches"]), SEARCH_SHOWN)
+            if result["truncated"] or len(result["matches"]) > shown:
+                self.log_ready.emit(f"   … showing the first {shown} matches.")
+            self.log_ready.emit("")
+        except Exception as e:
+            self.log_ready.emit(f"⚠ Search failed: {e}")
+        finally:
+            self.searching = False
+
     def launch_exe(self, exe_name: str):
         try:
             os.startfile(exe_name)
@@ -1,28 +1,44 @@
 import subprocess
 import threading
+import time
 import requests
 
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QTextEdit,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
+from PyQt6.QtCore import Qt, pyqtSignal
 
 from app.ui.widgets.cards import Card
 from app.ui.widgets.buttons import PrimaryButton, SecondaryButton
+from app.utils.crash_clusters import get_crash_clusters
+from app.utils.troubleshooter import run_all_checks
 
 
 class TroubleshooterPage(QWidget):
     """
     Troubleshooter:
+    - Run diagnostics (results appear as each check finishes)
     - Network reset / flush / test
     - Renew IP
     - Kill FiveM / Steam
     - Restart Explorer
+    - Group FiveM crash dumps by signature
     No cleaning tools.
     """
 
+    # cluster summary from the worker thread
+    clusters_ready = pyqtSignal(object)
+    # log lines from worker threads
+    log_ready = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
+        self.clustering = False
+        self.diagnosing = False
         self.build_ui()
+        self.clusters_ready.connect(self.show_clusters)
+        self.log_ready.connect(self.log.append)
 
     # ---------------------------------------------------------
     # BUILD UI
@@ -58,16 +74,19 @@ class TroubleshooterPage(QWidget):
         btn_reset_net = SecondaryButton("Reset Network Stack")
         btn_renew_ip = SecondaryButton("Renew IP")
         btn_test_conn = SecondaryButton("Test Connection")
+        btn_diagnostics = SecondaryButton("Run Diagnostics")
 
         btn_flush_dns.clicked.connect(lambda: self.run_async(self.flush_dns))
         btn_reset_net.clicked.connect(lambda: self.run_async(self.reset_network))
         btn_renew_ip.clicked.connect(lambda: self.run_async(self.renew_ip))
         btn_test_conn.clicked.connect(lambda: self.run_async(self.test_connection))
+        btn_diagnostics.clicked.connect(self.run_diagnostics_async)
 
         row1.addWidget(btn_flush_dns)
         row1.addWidget(btn_reset_net)
         row1.addWidget(btn_renew_ip)
         row1.addWidget(btn_test_conn)
+        row1.addWidget(btn_diagnostics)
 
         net_layout.addLayout(row1)
         layout.addWidget(net_card)
@@ -104,6 +123,61 @@ class TroubleshooterPage(QWidget):
         proc_layout.addLayout(row2)
         layout.addWidget(proc_card)
 
+        # =========================================================
+        # CRASH CLUSTERS
+        # =========================================================
+        crash_card = Card()
+        crash_layout = QVBoxLayout(crash_card)
+
+        header3 = QLabel("FiveM Crashes")
+        header3.setStyleSheet("font-size: 16px; color: white; font-weight: 600;")
+        crash_layout.addWidget(header3)
+
+        row3 = QHBoxLayout()
+        row3.setSpacing(12)
+
+        btn_clusters = SecondaryButton("Group Crash Dumps")
+        btn_clusters.clicked.connect(self.update_clusters_async)
+        row3.addWidget(btn_clusters)
+
+        self.crash_status = QLabel("Groups crash dumps that crashed the same way.")
+        self.crash_status.setStyleSheet("color: #94a3b8; font-size: 13px;")
+        row3.addWidget(self.crash_status)
+        row3.addStretch()
+        crash_layout.addLayout(row3)
+
+        self.cluster_table = QTableWidget(0, 5)
+        self.cluster_table.setHorizontalHeaderLabels(
+            ["Crashes", "Exception", "Crash location / stack", "First", "Last"]
+        )
+        self.cluster_table.verticalHeader().setVisible(False)
+        self.cluster_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.cluster_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.cluster_table.setMinimumHeight(180)
+        self.cluster_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #0b1120;
+                color: #d0d8e8;
+                gridline-color: #1e293b;
+                border: none;
+                font-size: 13px;
+            }
+            QHeaderView::section {
+                background-color: #1e293b;
+                color: #cbd5e1;
+                padding: 4px;
+                border: none;
+            }
+        """)
+        header = self.cluster_table.horizontalHeader()
+        for column in (0, 1, 3, 4):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.cluster_table.hide()
+        crash_layout.addWidget(self.cluster_table)
+
+        layout.addWidget(crash_card)
+
         # =========================================================
         # LOG OUTPUT
         # =========================================================
@@ -172,6 +246,87 @@ class TroubleshooterPage(QWidget):
         except Exception:
             self.log_msg("✖ Internet unreachable.")
 
+    # ---------------------------------------------------------
+    # DIAGNOSTICS
+    # ---------------------------------------------------------
+    def run_diagnostics_async(self):
+        if self.diagnosing:
+            return
+        self.diagnosing = True
+        threading.Thread(target=self.run_diagnostics, daemon=True).start()
+
+    def run_diagnostics(self):
+        """
+        Runs on a worker thread; each check is logged as soon as it finishes.
+        """
+        self.log_ready.emit("⏳ Running diagnostics…")
+        started = time.perf_counter()
+        try:
+            results = run_all_checks(
+                on_result=lambda name, result: self.log_ready.emit(
+                    f"{'✔' if result['status'] else '✖'} {name}: {result['message']}"
+                )
+            )
+            failed = sum(1 for r in results.values() if not r["status"])
+            self.log_ready.emit(
+                f"Diagnostics done in {time.perf_counter() - started:.1f}s — "
+                + (f"{failed} issue(s) found.\n" if failed else "no issues found.\n")
+            )
+        except Exception as e:
+            self.log_ready.emit(f"⚠ Diagnostics failed: {e}")
+        finally:
+            self.diagnosing = False
+
+    # ---------------------------------------------------------
+    # CRASH CLUSTERS
+    # ---------------------------------------------------------
+    def update_clusters_async(self):
+        if self.clustering:
+            return
+        self.clustering = True
+        self.crash_status.setText("⏳ Reading crash dumps…")
+        threading.Thread(target=self.update_clusters, daemon=True).start()
+
+    def update_clusters(self):
+        """
+        Runs on a worker thread; only dumps added since the last run are read.
+        """
+        try:
+            self.clusters_ready.emit(get_crash_clusters().update())
+        except Exception as e:
+            self.clusters_ready.emit(e)
+        finally:
+            self.clustering = False
+
+    def show_clusters(self, summary):
+        if isinstance(summary, Exception):
+            self.crash_status.setText(f"⚠ Crash grouping failed: {summary}")
+            return
+
+        clusters = summary["clusters"]
+        text = f"{summary['dumps']} dumps in {len(clusters)} groups ({summary['parsed']} new"
+        if summary["unreadable"]:
+            text += f", {summary['unreadable']} unreadable"
+        self.crash_status.setText(text + ").")
+
+        self.cluster_table.setRowCount(len(clusters))
+        for i, cluster in enumerate(clusters):
+            count = QTableWidgetItem(f"{cluster['count']:,}")
+            count.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            where = cluster["location"]
+            if cluster["modules"]:
+                where += "  ←  " + " › ".join(cluster["modules"])
+            where_item = QTableWidgetItem(where)
+            where_item.setToolTip(f"{where}\nLatest dump: {cluster['sample']}")
+
+            self.cluster_table.setItem(i, 0, count)
+            self.cluster_table.setItem(i, 1, QTableWidgetItem(cluster["exception"]))
+            self.cluster_table.setItem(i, 2, where_item)
+            for column, when in ((3, cluster["first"]), (4, cluster["last"])):
+                stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(when))
+                self.cluster_table.setItem(i, column, QTableWidgetItem(stamp))
+        self.cluster_table.setVisible(bool(clusters))
+
     # ---------------------------------------------------------
     # PROCESS TOOLS
     # ---------------------------------------------------------
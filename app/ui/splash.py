@@ -7,13 +7,27 @@ from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QProgressBar
 
 
 from app.utils.updater import check_for_updates, CURRENT_VERSION
-from app.utils.systeminfo import get_storage_analysis
+from app.utils.systeminfo import summarize_scans
+from app.utils.scan_service import get_scan_service
 from app.ui.widgets.update_dialog import UpdateDialog
+from app.ui.widgets.formatting import format_bytes
 
 
 class SplashScreen(QWidget):
     finished = pyqtSignal(object)  # emits storage_info
 
+    # Scan events come from worker threads; these hop them onto the UI thread
+    scan_progress = pyqtSignal(object)
+    scan_done = pyqtSignal()
+
+    # Share of the bar used by the storage scan (the rest is updates/finalize)
+    SCAN_START = 30
+    SCAN_END = 95
+
+    # Seconds the startup scan may take; slower roots report partial sizes
+    # and are finished in the background by the Dashboard page
+    STARTUP_SCAN_BUDGET = 4.0
+
     def __init__(self):
         super().__init__()
 
@@ -69,6 +83,16 @@ class SplashScreen(QWidget):
 
         self.setLayout(layout)
 
+        self.service = get_scan_service()
+        self.root_progress = {}
+        self.scan_futures = {}
+        self.storage_info = {}
+        self._scan_finished = False
+
+        self.scan_progress.connect(self.on_scan_progress)
+        self.scan_done.connect(self.on_scan_done)
+        self._progress_cb = self.scan_progress.emit  # same object for unsubscribe
+
         # Start fade-in
         self.fade_in()
 
@@ -91,13 +115,64 @@ class SplashScreen(QWidget):
 
         self.update_info = (update_available, latest_version)
 
-        # Step 2: Scan storage
+        # Step 2: Scan storage (runs on the scan service, progress streams in)
         self.sub.setText("Scanning storage and cache...")
-        self.progress.setValue(60)
-        self.storage_info = get_storage_analysis()
+        self.progress.setValue(self.SCAN_START)
+
+        self.service.subscribe_progress(self._progress_cb)
+        self.scan_futures = self.service.scan_all(deadline=self.STARTUP_SCAN_BUDGET)
+        for fut in self.scan_futures.values():
+            fut.add_done_callback(lambda _: self._check_scan_done())
+
+    def _check_scan_done(self):
+        # Called from scan threads; the slot ignores repeats
+        if all(f.done() for f in self.scan_futures.values()):
+            self.scan_done.emit()
+
+    def on_scan_progress(self, event):
+        self.root_progress[event["root"]] = event
+
+        # Per root: done = 1.0, else files seen vs. last scan's count
+        fractions = []
+        for label in self.scan_futures:
+            ev = self.root_progress.get(self.service.path_for(label))
+            if ev is None:
+                fractions.append(0.0)
+            elif ev["done"]:
+                fractions.append(1.0)
+            elif ev["expected_files"]:
+                fractions.append(min(0.99, ev["files"] / ev["expected_files"]))
+            else:
+                fractions.append(0.0)
+
+        share = sum(fractions) / max(1, len(fractions))
+        span = self.SCAN_END - self.SCAN_START
+        self.progress.setValue(max(self.progress.value(), self.SCAN_START + int(span * share)))
+
+        files = sum(ev["files"] for ev in self.root_progress.values())
+        size = sum(ev["bytes"] for ev in self.root_progress.values())
+        self.sub.setText(f"Scanning storage and cache... {files:,} files ({format_bytes(size)})")
+
+    def on_scan_done(self):
+        if self._scan_finished:
+            return
+        self._scan_finished = True
+        self.service.unsubscribe_progress(self._progress_cb)
+
+        scans = {}
+        for label, fut in self.scan_futures.items():
+            try:
+                scans[label] = fut.result()
+            except Exception as e:
+                print(f"Startup scan failed for {label}: {e}")
+                scans[label] = {"bytes": 0}
+        self.storage_info = summarize_scans(scans)
 
         # Step 3: Finalizing
-        self.sub.setText("Finalizing startup...")
+        if any(scan.get("partial") for scan in scans.values()):
+            self.sub.setText("Finalizing startup... (large folders still being measured)")
+        else:
+            self.sub.setText("Finalizing startup...")
         self.progress.setValue(100)
 
         # Tiny pause then fade out
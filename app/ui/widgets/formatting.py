@@ -0,0 +1,7 @@
+def format_bytes(num: int):
+    """Convert bytes → readable size."""
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if num < 1024:
+            return f"{num:.2f} {unit}"
+        num /= 1024
+    return f"{num:.2f} TB"
@@ -0,0 +1,101 @@
+import os
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget
+)
+from PyQt6.QtCore import Qt
+
+from app.ui.widgets.formatting import format_bytes
+
+
+class LargestItemsDialog(QDialog):
+    """
+    Drill-down for one scanned folder: its largest files and
+    sub-directories, straight from the scan result (no extra walk).
+    """
+
+    def __init__(self, name, scan, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle(f"{name} — largest items")
+        self.resize(820, 520)
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #0f172a;
+            }
+            QLabel {
+                color: #e2e8f0;
+                font-size: 14px;
+            }
+            QTableWidget {
+                background-color: #0b1120;
+                color: #d0d8e8;
+                gridline-color: #1e293b;
+                border: none;
+                font-size: 13px;
+            }
+            QHeaderView::section {
+                background-color: #1e293b;
+                color: #cbd5e1;
+                padding: 4px;
+                border: none;
+            }
+            QPushButton {
+                background-color: #1e293b;
+                color: white;
+                padding: 8px 18px;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background-color: #334155;
+            }
+        """)
+
+        root = scan["path"]
+        total = scan["bytes"] or 1
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        summary = QLabel(
+            f"<b>{name}</b>: {format_bytes(scan['bytes'])} in "
+            f"{scan['files']:,} files, {scan['dirs']:,} folders"
+        )
+        layout.addWidget(summary)
+
+        if scan.get("partial"):
+            layout.addWidget(QLabel("Scan stopped early — lists cover the part that was scanned."))
+
+        tabs = QTabWidget()
+        tabs.addTab(self._table(scan.get("top_files", []), root, total), "Largest files")
+        tabs.addTab(self._table(scan.get("top_dirs", []), root, total), "Largest folders")
+        layout.addWidget(tabs)
+
+        row = QHBoxLayout()
+        row.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+
+    def _table(self, entries, root, total):
+        table = QTableWidget(len(entries), 3)
+        table.setHorizontalHeaderLabels(["Size", "% of folder", "Path"])
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+
+        for i, (size, path) in enumerate(entries):
+            size_item = QTableWidgetItem(format_bytes(size))
+            size_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(i, 0, size_item)
+            table.setItem(i, 1, QTableWidgetItem(f"{size * 100 / total:.1f}%"))
+            table.setItem(i, 2, QTableWidgetItem(os.path.relpath(path, root)))
+
+        return table
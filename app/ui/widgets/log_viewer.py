@@ -0,0 +1,209 @@
+import os
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QListView,
+    QCheckBox, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+from PyQt6.QtGui import QFont, QColor
+
+from app.ui.widgets.formatting import format_bytes
+from app.utils.log_tail import LineIndex
+
+
+# Lines indexed when the viewer opens (more load while scrolling up)
+INITIAL_LINES = 2000
+
+# Follow mode: how often the file is checked for new lines (ms)
+FOLLOW_INTERVAL = 500
+
+# Scrolling this close to the top loads the previous block
+LOAD_MARGIN = 50
+
+
+class LogLineModel(QAbstractListModel):
+    """
+    Virtual list over a LineIndex: the view only asks for the rows it
+    shows, so nothing but the visible lines is ever decoded.
+    """
+
+    ERROR_COLOR = QColor("#f87171")
+    WARNING_COLOR = QColor("#fbbf24")
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.source.lines
+
+    def data(self, idx, role=Qt.ItemDataRole.DisplayRole):
+        if not idx.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.source.line(idx.row())
+        if role == Qt.ItemDataRole.ForegroundRole:
+            text = self.source.line(idx.row())
+            if "rror" in text or "RROR" in text:
+                return self.ERROR_COLOR
+            if "arning" in text or "ARNING" in text:
+                return self.WARNING_COLOR
+        return None
+
+    def load_earlier(self):
+        """Indexes the previous block; returns the number of rows added."""
+        block = self.source.scan_back()
+        if block is None:
+            return 0
+        count = block[2]
+        if count:
+            self.beginInsertRows(QModelIndex(), 0, count - 1)
+        self.source.add_front(block)
+        if count:
+            self.endInsertRows()
+        return count
+
+    def follow(self):
+        """Picks up appended lines; returns the number of rows added."""
+        open_row = self.source.lines - 1 if self.source.last_line_open() else None
+
+        blocks = self.source.scan_growth()
+        if blocks is None:
+            # Rotated or truncated: start over on the new file
+            self.beginResetModel()
+            self.source.open()
+            self.endResetModel()
+            while self.source.lines < INITIAL_LINES and self.load_earlier():
+                pass
+            return 0
+        if not blocks:
+            return 0
+
+        old = self.source.lines
+        added = self.source.rows_added(blocks)
+
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), old, old + added - 1)
+        self.source.apply_growth(blocks)
+        if added > 0:
+            self.endInsertRows()
+
+        # The line that was still being written got longer
+        if open_row is not None:
+            changed = self.createIndex(open_row, 0)
+            self.dataChanged.emit(changed, changed)
+        return added
+
+
+class LogViewerDialog(QDialog):
+    """
+    Tail / follow viewer for big FiveM logs. Opens at the end of the
+    file right away; earlier lines are indexed as the user scrolls up
+    and new lines appear while "Follow" is on.
+    """
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle(f"{os.path.basename(path)} — log viewer")
+        self.resize(1000, 620)
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #0f172a;
+            }
+            QLabel, QCheckBox {
+                color: #e2e8f0;
+                font-size: 14px;
+            }
+            QListView {
+                background-color: #0b1120;
+                color: #d0d8e8;
+                border: none;
+            }
+            QPushButton {
+                background-color: #1e293b;
+                color: white;
+                padding: 8px 18px;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background-color: #334155;
+            }
+        """)
+
+        self.path = path
+        self.model = LogLineModel(LineIndex(path), self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        self.status = QLabel()
+        layout.addWidget(self.status)
+
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerItem)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.view.setFont(font)
+        layout.addWidget(self.view)
+
+        row = QHBoxLayout()
+        self.follow_box = QCheckBox("Follow (show new lines as they are written)")
+        self.follow_box.setChecked(True)
+        row.addWidget(self.follow_box)
+        row.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+
+        while self.model.source.lines < INITIAL_LINES and self.model.load_earlier():
+            pass
+        self.view.scrollToBottom()
+        self._update_status()
+
+        self.view.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._poll)
+        self.timer.start(FOLLOW_INTERVAL)
+
+        self.finished.connect(self._shutdown)
+
+    def _on_scroll(self, value):
+        if value > LOAD_MARGIN or self.model.source.at_start:
+            return
+        added = self.model.load_earlier()
+        if added:
+            # Rows went in above: keep the same lines on screen
+            self.view.verticalScrollBar().setValue(value + added)
+            self._update_status()
+
+    def _poll(self):
+        try:
+            added = self.model.follow()
+        except (OSError, ValueError) as e:
+            self.status.setText(f"Stopped following: {e}")
+            self.timer.stop()
+            return
+
+        if added and self.follow_box.isChecked():
+            self.view.scrollToBottom()
+        if added:
+            self._update_status()
+
+    def _update_status(self):
+        index = self.model.source
+        shown = index.size - index.origin
+        text = f"{format_bytes(index.size)} — {index.lines:,} lines loaded"
+        if not index.at_start:
+            text += f" (last {format_bytes(shown)}; scroll up for earlier lines)"
+        self.status.setText(text)
+
+    def _shutdown(self):
+        self.timer.stop()
+        self.model.source.close()
@@ -0,0 +1,262 @@
+import dataclasses
+import os
+import shutil
+import time
+import zipfile
+
+from app.utils.paths import app_data_dir
+from app.utils.walk import list_files
+
+
+ARCHIVE_DIR = "archives"
+ARCHIVE_PREFIX = "fivem-logs-"
+
+# Total size all archives may use; the oldest are evicted past this
+ARCHIVE_CAP = 2 * 1024 * 1024 * 1024
+
+# Copy buffer when entries are re-packed (see _drop_entries)
+CHUNK_SIZE = 1024 * 1024
+
+COMPRESSION = {
+    "zlib": (zipfile.ZIP_DEFLATED, 6),
+    "lzma": (zipfile.ZIP_LZMA, None),
+}
+
+
+def archive_dir():
+    path = os.path.join(app_data_dir(), ARCHIVE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# -------------------------------
+#  ARCHIVE WRITER
+# -------------------------------
+def _add_file(zf, path, arcname, size, mtime_ns, limiter=None):
+    """
+    Streams one file into the open archive (ZipFile.write copies in
+    small chunks, so memory stays flat however big a dump is).
+
+    Returns:
+        None on success, a skip reason if nothing was written, or
+        "bad entry" if the copy started but didn't finish cleanly
+        (read error, file changed meanwhile): that entry is in the
+        archive and must be dropped (see _drop_entries).
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "unreadable"
+    if st.st_size != size or st.st_mtime_ns != mtime_ns:
+        return "changed"
+
+    if limiter:
+        limiter.charge(1, size)
+
+    written = len(zf.infolist())
+    try:
+        zf.write(path, arcname)
+    except PermissionError:
+        failed = "locked"
+    except OSError:
+        # Write errors (disk full...) can't be told apart here; if the
+        # archive itself is broken, closing it raises and aborts
+        failed = "unreadable"
+    else:
+        info = zf.infolist()[-1]
+        return None if info.file_size == size else "bad entry"
+
+    return "bad entry" if len(zf.infolist()) > written else failed
+
+
+def _drop_entries(path, names):
+    """
+    Re-packs the archive at path without the entries in names
+    (half-copied files). Only needed after a read error, so rare.
+    """
+    temp = path + ".repack"
+    try:
+        with zipfile.ZipFile(path) as src, \
+                zipfile.ZipFile(temp, "w", allowZip64=True) as dst:
+            for info in src.infolist():
+                if info.filename in names:
+                    continue
+                copy = zipfile.ZipInfo(info.filename, info.date_time)
+                copy.compress_type = info.compress_type
+                copy.file_size = info.file_size
+                with src.open(info) as r, dst.open(copy, "w", force_zip64=True) as w:
+                    shutil.copyfileobj(r, w, CHUNK_SIZE)
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+
+
+def _reserve_name(folder):
+    """
+    A new archive name (timestamp, plus a counter when one was already
+    made in the same second) and its temporary file, created
+    exclusively so two cleans can't pick the same name.
+
+    Returns:
+        (final path, temporary path)
+    """
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    for n in range(1000):
+        suffix = f"-{n}" if n else ""
+        final = os.path.join(folder, f"{ARCHIVE_PREFIX}{stamp}{suffix}.zip")
+        temp = final + ".partial"
+        if os.path.exists(final):
+            continue
+        try:
+            os.close(os.open(temp, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue
+        return final, temp
+    raise FileExistsError(f"No free archive name for {stamp}")
+
+
+def archive_plans(targets, compression="zlib", cap=ARCHIVE_CAP, token=None, limiter=None):
+    """
+    Streams every file of one or more clean plans (TargetPlan) into a
+    new zip archive under the app data dir, one top-level folder per
+    target label. Files are copied in chunks, so memory stays flat
+    even for multi-hundred-MB dumps.
+
+    The archive is written under a temporary name and only renamed
+    into place once complete. Afterwards the oldest archives are
+    evicted until the total fits `cap` (the new one is always kept).
+    limiter (optional) is an IOLimiter for user-started cleans, charged
+    one operation plus the bytes per file.
+
+    Returns:
+        (summary, archived targets)
+
+        summary = { 'archive', 'files', 'bytes', 'compressed',
+                    'skipped': [(path, reason)], 'evicted': [paths], 'partial' }
+
+        archived targets are the same plans reduced to the files that
+        made it into the archive (the rest moved to 'skipped'), so
+        running them deletes only what was archived.
+    """
+    compress_type, level = COMPRESSION[compression]
+    summary = {
+        "archive": None, "files": 0, "bytes": 0, "compressed": 0,
+        "skipped": [], "evicted": [], "partial": False,
+    }
+
+    final, temp = _reserve_name(archive_dir())
+
+    archived = {}  # label -> list of batches
+    not_archived = {}  # label -> [(path, reason, size)]
+    bad = set()  # arcnames of half-copied entries
+
+    try:
+        with zipfile.ZipFile(temp, "w", compression=compress_type, compresslevel=level,
+                             allowZip64=True, strict_timestamps=False) as zf:
+            for target in targets:
+                kept_batches = []
+                for batch in target.batches:
+                    kept = []
+                    for path, size, mtime_ns in batch:
+                        reason = "stopped" if token and token.cancelled else None
+                        if reason is None:
+                            rel = os.path.relpath(path, target.path).replace(os.sep, "/")
+                            arcname = f"{target.label}/{rel}"
+                            reason = _add_file(zf, path, arcname, size, mtime_ns, limiter)
+                            if reason == "bad entry":
+                                bad.add(arcname)
+                                reason = "unreadable"
+                        if reason:
+                            summary["skipped"].append((path, reason))
+                            not_archived.setdefault(target.label, []).append(
+                                (path, f"not archived ({reason})", size))
+                            continue
+                        kept.append((path, size, mtime_ns))
+                        summary["files"] += 1
+                        summary["bytes"] += size
+                    if kept:
+                        kept_batches.append(tuple(kept))
+                archived[target.label] = kept_batches
+
+        if bad:
+            _drop_entries(temp, bad)
+    except BaseException:
+        # Disk full, stopped app...: never leave half an archive behind
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+
+    summary["partial"] = bool(token and token.cancelled)
+
+    if summary["files"]:
+        os.replace(temp, final)
+        summary["archive"] = final
+        summary["compressed"] = os.path.getsize(final)
+        summary["evicted"] = evict_archives(cap, keep=final)
+    else:
+        os.remove(temp)
+
+    reduced = []
+    for target in targets:
+        batches = archived[target.label]
+        extra = not_archived.get(target.label, [])
+        reduced.append(dataclasses.replace(
+            target,
+            batches=tuple(batches),
+            skipped=target.skipped + tuple(extra),
+            files=sum(len(b) for b in batches),
+            bytes=sum(size for b in batches for _, size, _ in b),
+            skipped_bytes=target.skipped_bytes + sum(size for _, _, size in extra),
+        ))
+
+    return summary, reduced
+
+
+# -------------------------------
+#  SIZE CAP
+# -------------------------------
+def list_archives():
+    """
+    Returns [(path, size, mtime)] of finished archives, oldest first.
+    """
+    archives = [
+        (path, st.st_size, st.st_mtime)
+        for path, st in list_files(archive_dir(), ".zip")
+        if os.path.basename(path).startswith(ARCHIVE_PREFIX)
+    ]
+    archives.sort(key=lambda a: a[2])
+    return archives
+
+
+def evict_archives(cap=ARCHIVE_CAP, keep=None):
+    """
+    Deletes the oldest archives until all of them fit in `cap` bytes.
+    `keep` (the archive just written) is never deleted.
+
+    Returns:
+        list of deleted archive paths
+    """
+    archives = list_archives()
+    total = sum(size for _, size, _ in archives)
+    evicted = []
+
+    for path, size, _ in archives:
+        if total <= cap:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Failed to evict archive {path}: {e}")
+            continue
+        total -= size
+        evicted.append(path)
+
+    return evicted
@@ -0,0 +1,143 @@
+"""
+Small benchmarks for the scan / clean engines.
+
+Run from the project root:
+    python -m app.utils.benchmarks scan [files] [workers...]
+    python -m app.utils.benchmarks unlink [files] [depth]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.utils import deleter
+from app.utils.scanner import scan_tree
+
+
+# -------------------------------
+#  Helper: Synthetic tree
+# -------------------------------
+def make_synthetic_tree(root, files=20000, fanout=8, per_dir=50, file_size=512):
+    """
+    Builds a nested folder tree with roughly `files` small files,
+    shaped a bit like a FiveM cache / temp folder (many dirs, many tiny files).
+    """
+    payload = b"x" * file_size
+    created = 0
+    queue = [root]
+
+    while created < files and queue:
+        current = queue.pop(0)
+        os.makedirs(current, exist_ok=True)
+
+        for i in range(min(per_dir, files - created)):
+            with open(os.path.join(current, f"f{i}.bin"), "wb") as f:
+                f.write(payload)
+            created += 1
+
+        for d in range(fanout):
+            queue.append(os.path.join(current, f"d{d}"))
+
+    return created
+
+
+def _timed(func, *args, repeat=3):
+    best = None
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+# -------------------------------
+#  BENCHMARKS
+# -------------------------------
+def bench_scan_workers(files=20000, worker_counts=(1, 2, 4, 8)):
+    """
+    Times scan_tree on a synthetic tree for each worker count and
+    checks that every run reports exactly the same totals.
+    """
+    root = tempfile.mkdtemp(prefix="lurp-bench-")
+    try:
+        make_synthetic_tree(os.path.join(root, "tree"), files=files)
+        tree = os.path.join(root, "tree")
+
+        print(f"Synthetic tree: {files} files in {tree}")
+        print(f"{'workers':>8} {'best (s)':>10} {'speedup':>8}")
+
+        baseline = None
+        expected = None
+        for workers in worker_counts:
+            elapsed, result = _timed(scan_tree, tree, workers)
+            totals = (result["bytes"], result["files"], result["dirs"], result["errors"])
+
+            if expected is None:
+                expected = totals
+            elif totals != expected:
+                raise RuntimeError(f"Totals differ for {workers} workers: {totals} != {expected}")
+
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>7.2f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_unlink(files=20000, depth=12, workers=(1, 4), repeat=3):
+    """
+    Times delete_tree with full-path unlinks against dir_fd-relative
+    unlinks on a synthetic tree buried `depth` folders deep (like the
+    FiveM cache under %localappdata%). Every run deletes a freshly
+    built tree; only the delete is timed.
+    """
+    if not deleter.DIR_FD_SUPPORTED:
+        print("dir_fd unlink is not supported on this platform; nothing to compare.")
+        return
+
+    root = tempfile.mkdtemp(prefix="lurp-bench-")
+    deep = os.path.join(root, *(f"level{i}" for i in range(depth)))
+    modes = (("full path", False), ("dir_fd", True))
+
+    print(f"Synthetic tree: {files} files, {depth} folders deep")
+    print(f"{'mode':>10} {'workers':>8} {'best (s)':>10} {'files/s':>10}")
+
+    try:
+        for count in workers:
+            for name, use_dir_fd in modes:
+                best = None
+                for _ in range(repeat):
+                    tree = os.path.join(deep, "tree")
+                    make_synthetic_tree(tree, files=files)
+
+                    deleter.USE_DIR_FD = use_dir_fd
+                    start = time.perf_counter()
+                    result = deleter.delete_tree(tree, workers=count, keep_root=False)
+                    elapsed = time.perf_counter() - start
+
+                    if result["files"] != files:
+                        raise RuntimeError(f"{name}: deleted {result['files']} of {files} files")
+                    best = elapsed if best is None else min(best, elapsed)
+
+                print(f"{name:>10} {count:>8} {best:>10.3f} {files / best:>10.0f}")
+    finally:
+        deleter.USE_DIR_FD = deleter.DIR_FD_SUPPORTED
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    name = args[0] if args else "scan"
+
+    if name == "scan":
+        count = int(args[1]) if len(args) > 1 else 20000
+        workers = tuple(int(w) for w in args[2:]) or (1, 2, 4, 8)
+        bench_scan_workers(count, workers)
+    elif name == "unlink":
+        count = int(args[1]) if len(args) > 1 else 20000
+        depth = int(args[2]) if len(args) > 2 else 12
+        bench_unlink(count, depth)
+    else:
+        print(f"Unknown benchmark: {name}")
@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class CancelToken:
+    """
+    Cooperative stop signal for scans and cleans, with an optional deadline.
+
+    Long loops check `token.cancelled` now and then and stop early,
+    returning whatever they have so far (flagged as partial).
+
+        token = CancelToken(timeout=2.0)   # "best answer within 2 seconds"
+        token.cancel()                     # stop right now
+    """
+
+    def __init__(self, timeout=None):
+        self._event = threading.Event()
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return False
+
+    @property
+    def expired(self):
+        """True when the deadline passed (as opposed to an explicit cancel)."""
+        return not self._event.is_set() and self.cancelled
+
+    def remaining(self):
+        """Seconds left before the deadline, or None if there is none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
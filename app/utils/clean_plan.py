@@ -0,0 +1,416 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+
+from app.utils.deleter import (
+    DELETE_WORKERS, new_delete_result, run_batches, remove_dirs, split_batch
+)
+from app.utils.scanner import new_result, TopN, largest_dirs
+from app.utils.scan_index import get_index, dump_top, RACY_WINDOW_NS
+from app.utils.walk import walk_tree
+
+
+# Files written this recently are probably still open (running game,
+# installer...) and are left out of the plan; they are reported as
+# "skipped (in use)" with their size
+IN_USE_WINDOW = 120
+IN_USE = "in use"
+
+_DAY_NS = 86400 * 1_000_000_000
+_MB = 1024 * 1024
+
+
+# -------------------------------
+#  POLICIES
+#
+#  A policy is a dict; every key is optional:
+#      min_age_days    only files not used (accessed or written) for N days
+#      keep_newest_mb  keep the most recently used X MB
+#      min_size        only files larger than Y bytes
+#  No policy (None / {}) means "everything".
+# -------------------------------
+# Shaders are rebuilt on the next launch (stutter), so keep what's in use
+SHADER_POLICY = {"min_age_days": 14, "keep_newest_mb": 512}
+
+# Installers and apps often keep working files in temp for a while
+TEMP_POLICY = {"min_age_days": 2}
+
+
+def describe_policy(policy):
+    """
+    Short text for a policy, e.g. "unused for 14+ days, keeping newest 512 MB".
+    """
+    if not policy:
+        return "everything"
+
+    parts = []
+    if policy.get("min_age_days"):
+        parts.append(f"unused for {policy['min_age_days']}+ days")
+    if policy.get("min_size"):
+        parts.append(f"larger than {policy['min_size'] // 1024} KB")
+    if policy.get("keep_newest_mb"):
+        parts.append(f"keeping newest {policy['keep_newest_mb']} MB")
+    return ", ".join(parts)
+
+
+# -------------------------------
+#  PLAN OBJECTS
+# -------------------------------
+@dataclass(frozen=True)
+class TargetPlan:
+    """
+    What cleaning one folder would do, from a single walk.
+
+    batches:  per directory (big ones split, see split_batch), tuple of
+              (path, size, mtime_ns) to delete
+    dirs:     (path, mtime_ns) for every directory, parents first
+    skipped:  (path, reason, size) for entries that will be left alone
+    """
+    label: str
+    path: str
+    batches: tuple
+    dirs: tuple
+    skipped: tuple
+    files: int
+    bytes: int
+    skipped_bytes: int
+    partial: bool = False
+
+    def skip_reasons(self):
+        """Returns { reason: count }."""
+        reasons = {}
+        for _, reason, _ in self.skipped:
+            reasons[reason] = reasons.get(reason, 0) + 1
+        return reasons
+
+    def in_use(self):
+        """Returns (files, bytes) left alone because they were just written."""
+        sizes = [size for _, reason, size in self.skipped if reason == IN_USE]
+        return len(sizes), sum(sizes)
+
+
+@dataclass(frozen=True)
+class CleanPlan:
+    """
+    Immutable dry-run result for several targets (label -> TargetPlan).
+    """
+    targets: tuple
+    created: float
+
+    @property
+    def bytes(self):
+        return sum(t.bytes for t in self.targets)
+
+    @property
+    def files(self):
+        return sum(t.files for t in self.targets)
+
+    def get(self, label):
+        for target in self.targets:
+            if target.label == label:
+                return target
+        return None
+
+
+# -------------------------------
+#  PLANNING
+# -------------------------------
+def plan_target(label, path, token=None, now=None, policy=None):
+    """
+    Walks path once and records every file that cleaning would delete,
+    with its size and mtime, plus the files expected to be skipped.
+
+    policy (optional, see POLICIES) is applied during the same walk;
+    keep_newest_mb is settled once all candidates are known.
+    "Last used" is the later of access and modification time (access
+    times can be coarse or disabled, so writes always count).
+
+    token (optional) is a CancelToken; a stopped walk gives a plan
+    flagged partial that only covers what was listed.
+    """
+    policy = policy or {}
+    now_ns = int((now or time.time()) * 1_000_000_000)
+    in_use_ns = IN_USE_WINDOW * 1_000_000_000
+    min_age_ns = policy.get("min_age_days", 0) * _DAY_NS
+    min_size = policy.get("min_size", 0)
+    keep_newest = policy.get("keep_newest_mb", 0) * _MB
+
+    # (path, size, mtime_ns, last_used_ns, dir index)
+    candidates = []
+    dirs, skipped = [], []
+    skipped_bytes = 0
+
+    def unreadable(entry_path, e):
+        reason = "unreadable folder" if os.path.isdir(entry_path) else "unreadable"
+        skipped.append((entry_path, reason, 0))
+
+    # Links (symlinks, junctions) are planned as files and never entered
+    for current, entries in walk_tree(path, token, unreadable):
+        try:
+            dirs.append((current, os.stat(current).st_mtime_ns))
+        except OSError:
+            skipped.append((current, "unreadable folder", 0))
+            continue
+
+        dir_index = len(dirs) - 1
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                skipped.append((entry.path, "unreadable", 0))
+                continue
+
+            last_used = max(st.st_atime_ns, st.st_mtime_ns)
+            reason = None
+            if now_ns - st.st_mtime_ns < in_use_ns:
+                reason = IN_USE
+            elif min_age_ns and now_ns - last_used < min_age_ns:
+                reason = "recently used"
+            elif min_size and st.st_size <= min_size:
+                reason = "too small"
+
+            if reason:
+                skipped.append((entry.path, reason, st.st_size))
+                skipped_bytes += st.st_size
+                continue
+
+            candidates.append((entry.path, st.st_size, st.st_mtime_ns, last_used, dir_index))
+
+    partial = bool(token and token.cancelled)
+
+    # Keep the most recently used files up to the budget
+    if keep_newest:
+        kept = 0
+        keep = set()
+        for c in sorted(candidates, key=lambda c: c[3], reverse=True):
+            if kept + c[1] > keep_newest:
+                break
+            kept += c[1]
+            keep.add(c[0])
+
+        skipped.extend((c[0], "kept (newest)", c[1]) for c in candidates if c[0] in keep)
+        skipped_bytes += kept
+        candidates = [c for c in candidates if c[0] not in keep]
+
+    # One batch per directory (split when big), in walk order
+    grouped = {}
+    for file_path, size, mtime_ns, _, dir_index in candidates:
+        grouped.setdefault(dir_index, []).append((file_path, size, mtime_ns))
+
+    return TargetPlan(
+        label=label,
+        path=path,
+        batches=tuple(
+            tuple(batch) for i in sorted(grouped) for batch in split_batch(grouped[i])
+        ),
+        dirs=tuple(dirs),
+        skipped=tuple(skipped),
+        files=len(candidates),
+        bytes=sum(c[1] for c in candidates),
+        skipped_bytes=skipped_bytes,
+        partial=partial,
+    )
+
+
+def build_plan(paths, token=None, policies=None):
+    """
+    Dry run for several folders.
+
+    Args:
+        paths: dict of label -> expanded path
+        policies: optional dict of label -> policy
+
+    Returns:
+        CleanPlan
+    """
+    policies = policies or {}
+    now = time.time()
+    targets = tuple(
+        plan_target(label, p, token, now, policies.get(label))
+        for label, p in paths.items()
+    )
+    return CleanPlan(targets=targets, created=now)
+
+
+# -------------------------------
+#  EXECUTION
+# -------------------------------
+def execute_target(target, workers=DELETE_WORKERS, keep_root=True, token=None, progress=None,
+                   journal=None, limiter=None):
+    """
+    Deletes exactly the files listed in a TargetPlan, without walking
+    again. Each file's size/mtime is checked right before it is deleted;
+    files that changed are left alone (counted as 'changed') and files
+    added since the plan are not touched, so a busy folder never needs
+    planning again.
+
+    journal (optional) is a Journal; the plan and every finished batch
+    are recorded so an interrupted run can be resumed on the next start.
+    limiter (optional) is an IOLimiter for user-started cleans (see
+    delete_tree).
+
+    Returns:
+        delete result (see delete_tree), with 'in_use' set to the bytes
+        the plan skipped because they were just written
+    """
+    result = new_delete_result(target.path)
+    result["partial"] = target.partial
+    result["in_use"] = target.in_use()[1]
+
+    job = journal.begin_plan(target, keep_root) if journal else None
+
+    def batches():
+        for seq, batch in enumerate(target.batches):
+            if job:
+                journal.batch(job, seq, batch)
+            yield batch
+
+    # Stopped on purpose (or failed) counts as finished; only a kill or
+    # crash leaves the job open for the next start
+    try:
+        run_batches(batches(), result, workers, token, progress,
+                    (lambda seq: journal.done(job, seq)) if job else None, limiter)
+        remove_dirs(target.path, [d for d, _ in target.dirs], result, keep_root)
+    finally:
+        if job:
+            journal.end(job)
+
+    if progress:
+        progress.finish(result)
+
+    return result
+
+
+# -------------------------------
+#  ACCOUNTING (fused scan + clean)
+# -------------------------------
+def account(target, result):
+    """
+    Exact folder totals before and after running a plan, worked out
+    from the plan walk and the delete result instead of a second walk.
+
+    Everything the plan saw is either deleted, gone, or still there:
+    skipped entries and failed deletes remain (failed ones are re-stat'ed,
+    they are few). Each planned directory is stat'ed once for its new
+    mtime, which also shows which ones were removed; only folders whose
+    mtime still matches the plan go to the index as trusted rows.
+
+    Only valid for a complete run (not partial plans or stopped cleans).
+
+    Returns:
+        { 'before': scan result, 'after': scan result,
+          'reclaimed': bytes actually deleted,
+          'rows': scan index rows for the folders that are left,
+          'stale': planned folders that are gone }
+    """
+    before = new_result(target.path)
+    after = new_result(target.path)
+
+    # What is left, per directory: [(size, name)]
+    left = {path: [] for path, _ in target.dirs}
+    unreadable = {path: 0 for path, _ in target.dirs}
+
+    for path, reason, size in target.skipped:
+        parent = os.path.dirname(path)
+        if reason == "unreadable folder":
+            unreadable[path] = unreadable.get(path, 0) + 1
+        elif reason == "unreadable":
+            unreadable[parent] = unreadable.get(parent, 0) + 1
+        else:
+            left.setdefault(parent, []).append((size, os.path.basename(path)))
+            before["files"] += 1
+            before["bytes"] += size
+
+    before["files"] += target.files
+    before["bytes"] += target.bytes
+    before["dirs"] = max(0, len(target.dirs) - 1)
+    before["errors"] = sum(unreadable.values())
+
+    for path, category in result["failures"]:
+        try:
+            size = os.lstat(path).st_size
+        except OSError:
+            continue
+        left.setdefault(os.path.dirname(path), []).append((size, os.path.basename(path)))
+
+    # Folders still there, with their new mtimes
+    now_ns = time.time_ns()
+    planned = dict(target.dirs)
+    mtimes = {}
+    for path, _ in target.dirs:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+
+    children = {path: [] for path in mtimes}
+    for path in mtimes:
+        parent = os.path.dirname(path)
+        if path != target.path and parent in children:
+            children[parent].append(os.path.basename(path))
+
+    top = TopN()
+    own_sizes = {}
+    rows = []
+    for path, mtime_ns in mtimes.items():
+        files = left.get(path, [])
+        own_top = TopN()
+        for size, name in files:
+            own_top.push(size, os.path.join(path, name))
+        top.update(own_top)
+
+        own_bytes = sum(size for size, _ in files)
+        own_sizes[path] = own_bytes
+        after["bytes"] += own_bytes
+        after["files"] += len(files)
+        after["errors"] += unreadable.get(path, 0)
+        after["dirs"] += len(children[path])
+
+        # What is left is only known for folders nothing touched since
+        # the plan walk; any other (cleaned here, or written to
+        # meanwhile) is listed again by the next incremental scan
+        unchanged = mtime_ns == planned[path]
+        trusted = mtime_ns if unchanged and now_ns - mtime_ns > RACY_WINDOW_NS else -1
+        rows.append((
+            path, trusted, own_bytes, len(files), unreadable.get(path, 0),
+            json.dumps(children[path]), dump_top(own_top),
+        ))
+
+    after["top_files"] = top.items()
+    after["top_dirs"] = largest_dirs(target.path, own_sizes)
+
+    return {
+        "before": before,
+        "after": after,
+        "reclaimed": result["bytes"],
+        "rows": rows,
+        "stale": [path for path, _ in target.dirs if path not in mtimes],
+    }
+
+
+def record_clean(target, result, index=None):
+    """
+    Second half of a fused scan + clean: after a plan ran (and any
+    retries are folded into result), works out the new totals with
+    account() and writes the folders that are left to the scan index,
+    so later incremental scans and the watcher continue from the new
+    state instead of walking again.
+
+    Returns:
+        accounting dict (see account), or None when the run was partial
+        and the totals can't be known without a scan
+    """
+    if result["partial"] or target.partial:
+        return None
+
+    totals = account(target, result)
+
+    index = index or get_index()
+    if index is not None:
+        try:
+            index.save(totals["rows"], totals["stale"])
+        except Exception as e:
+            print(f"Failed to update scan index after clean: {e}")
+
+    return totals
@@ -1,19 +1,38 @@
 import os
-import shutil
+
+from app.utils.deleter import delete_tree, new_delete_result, describe_failures
+from app.utils.staging import clean_instant
+from app.utils.retry_queue import retry_failures
+from app.utils.journal import get_journal
+from app.utils.clean_plan import plan_target, execute_target, SHADER_POLICY, TEMP_POLICY
+from app.utils.archiver import archive_plans
+from app.utils.throttle import current_limiter
 
 
 # -------------------------------
 #  Helper: Safe delete folder
 # -------------------------------
-def safe_delete(path):
+def safe_delete(path, limiter=None):
     """
-    Deletes a folder safely.
+    Deletes a folder safely. Locked files are retried for a while and
+    then scheduled for the next start (see retry_queue); files that
+    still can't be removed are left behind and counted instead of raising.
+    limiter (optional) is the IOLimiter of the clean calling this.
+
+    Returns:
+        delete result (see delete_tree)
     """
     try:
-        if os.path.exists(path):
-            shutil.rmtree(path, ignore_errors=True)
+        result = delete_tree(path, keep_root=False, journal=get_journal(), limiter=limiter)
+        retry_failures([result])
     except Exception as e:
         print(f"Failed to delete {path}: {e}")
+        return new_delete_result(path)
+
+    failures = describe_failures(result)
+    if failures:
+        print(f"Some files in {path} were not deleted: {failures}")
+    return result
 
 
 # -------------------------------
@@ -22,44 +41,100 @@ def safe_delete(path):
 def clear_fivem_cache():
     """
     Clears FiveM's main cache.
+
+    Each folder is renamed into a staging folder and recreated empty
+    right away; the old files are purged in the background. Folders
+    that can't be renamed (files in use) are deleted in place.
     """
     cache_paths = [
         r"%localappdata%\FiveM\FiveM.app\data\cache",
         r"%localappdata%\FiveM\FiveM.app\data\nui-storage",
         r"%localappdata%\FiveM\FiveM.app\data\server-cache",
     ]
+    limiter = current_limiter()
 
     for p in cache_paths:
-        safe_delete(os.path.expandvars(p))
+        path = os.path.expandvars(p)
+        if not clean_instant(path):
+            safe_delete(path, limiter)
 
 
-def clear_fivem_logs():
+def clear_fivem_logs(archive=True):
     """
     Clears FiveM logs, crashes, and dumps.
+
+    With archive=True (default) everything is first streamed into a
+    compressed archive (see archiver) and only the files that made it
+    into the archive are deleted; files still in use stay put.
+    archive=False deletes the folders outright.
+
+    Returns:
+        archive summary (see archive_plans), or None when not archiving
     """
     paths = [
-        r"%localappdata%\FiveM\FiveM.app\logs",
-        r"%localappdata%\FiveM\FiveM.app\crashes",
-        r"%localappdata%\FiveM\FiveM.app\crash-reports",
+        ("FiveM Logs", r"%localappdata%\FiveM\FiveM.app\logs"),
+        ("FiveM Crashes", r"%localappdata%\FiveM\FiveM.app\crashes"),
+        ("FiveM Crash Reports", r"%localappdata%\FiveM\FiveM.app\crash-reports"),
     ]
+    limiter = current_limiter()
+
+    if not archive:
+        for _, p in paths:
+            safe_delete(os.path.expandvars(p), limiter)
+        return None
+
+    try:
+        targets = [plan_target(label, os.path.expandvars(p)) for label, p in paths]
+        summary, targets = archive_plans(targets, limiter=limiter)
+    except Exception as e:
+        print(f"Failed to archive FiveM logs, nothing was deleted: {e}")
+        return None
+
+    results = []
+    for target in targets:
+        try:
+            results.append(execute_target(target, journal=get_journal(), limiter=limiter))
+        except Exception as e:
+            print(f"Failed to clean {target.path}: {e}")
+    retry_failures(results)
+
+    return summary
+
+
+def clean_with_policy(label, path, policy):
+    """
+    Deletes only the files a policy selects (see clean_plan), in one
+    walk, keeping the folder itself, under the current I/O throttle.
+
+    Returns:
+        delete result (see delete_tree)
+    """
+    try:
+        result = execute_target(plan_target(label, path, policy=policy), journal=get_journal(),
+                                limiter=current_limiter())
+        retry_failures([result])
+    except Exception as e:
+        print(f"Failed to clean {path}: {e}")
+        return new_delete_result(path)
 
-    for p in paths:
-        safe_delete(os.path.expandvars(p))
+    failures = describe_failures(result)
+    if failures:
+        print(f"Some files in {path} were not deleted: {failures}")
+    return result
 
 
 def clear_temp_files():
     """
-    Clears Windows temp folder.
+    Clears old files from the Windows temp folder (TEMP_POLICY).
     """
     temp = os.path.expandvars(r"%temp%")
-    safe_delete(temp)
-    os.makedirs(temp, exist_ok=True)
+    return clean_with_policy("Windows Temp", temp, TEMP_POLICY)
 
 
 def clear_gta_shader_cache():
     """
-    Clears GTA V shader cache folder.
+    Clears unused GTA V shaders (SHADER_POLICY). Recently used shaders
+    are kept so the next launch doesn't have to recompile everything.
     """
     shader = os.path.expandvars(r"%localappdata%\Rockstar Games\GTA V\Shaders")
-    safe_delete(shader)
-    os.makedirs(shader, exist_ok=True)
+    return clean_with_policy("Shader Cache", shader, SHADER_POLICY)
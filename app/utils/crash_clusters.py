@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.paths import app_data_dir
+from app.utils.minidump import CRASHES_DIR, DUMP_WORKERS, find_dumps, parse_dump
+from app.utils.log_search import CRASH_REPORTS_DIR
+
+
+CLUSTER_FILE = "crash_clusters.json"
+
+CLUSTER_DIRS = {
+    "Crashes": CRASHES_DIR,
+    "Crash Reports": CRASH_REPORTS_DIR,
+}
+
+# Modules from the stack scan that go into a signature (after the
+# faulting location); deeper frames are mostly the same game loop
+STACK_MODULES = 4
+
+
+# -------------------------------
+#  SIGNATURES
+# -------------------------------
+def crash_signature(entry):
+    """
+    Normalised signature of a parsed dump (see parse_dump with stack=True):
+    exception, faulting module+offset (stable across runs, ASLR only moves
+    the base) and the chain of modules on the stack, case-folded and with
+    repeats collapsed.
+
+    Returns:
+        (cluster id, { 'exception', 'location', 'modules' })
+    """
+    if entry["module"]:
+        location = f"{entry['module'].lower()}+0x{entry['module_offset']:x}"
+    else:
+        location = "unknown module"
+
+    modules = []
+    for name, _ in entry["stack"] or ():
+        name = name.lower()
+        if not modules or modules[-1] != name:
+            modules.append(name)
+            if len(modules) >= STACK_MODULES:
+                break
+
+    key = "|".join([entry["code_name"], location] + modules)
+    cluster = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return cluster, {"exception": entry["code_name"], "location": location, "modules": modules}
+
+
+def _parse(path):
+    try:
+        return parse_dump(path, stack=True)
+    except (OSError, ValueError) as e:
+        return {"ok": False, "error": str(e)}
+
+
+# -------------------------------
+#  CLUSTER STORE
+# -------------------------------
+class CrashClusters:
+    """
+    Crash dumps grouped by signature, saved as JSON in the app data
+    folder. Each update only parses dumps that are new or changed since
+    the last one; counts and first / last occurrence are recomputed only
+    for the clusters that lost a dump.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), CLUSTER_FILE)
+        self._lock = threading.Lock()
+        self._dumps = None      # path -> {size, mtime_ns, cluster, time}
+        self._clusters = None   # cluster id -> {exception, location, modules, count, first, last, sample}
+
+    def _load(self):
+        if self._dumps is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._dumps = dict(data["dumps"])
+                self._clusters = dict(data["clusters"])
+            except (OSError, ValueError, KeyError, TypeError):
+                self._dumps, self._clusters = {}, {}
+
+    def _save(self):
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump({"dumps": self._dumps, "clusters": self._clusters}, f,
+                          separators=(",", ":"))
+            os.replace(temp, self.path)
+        except OSError as e:
+            print(f"Failed to save crash clusters: {e}")
+
+    def update(self, folders=None, workers=DUMP_WORKERS):
+        """
+        Brings the clusters up to date with the dumps in `folders`
+        (default: FiveM crashes and crash-reports).
+
+        Returns:
+            { 'dumps', 'parsed': dumps read this time, 'unreadable',
+              'clusters': [ { 'id', 'exception', 'location', 'modules',
+                              'count', 'first', 'last', 'sample' } ]  (largest first) }
+            first / last are epoch seconds
+        """
+        folders = folders or [os.path.expandvars(p) for p in CLUSTER_DIRS.values()]
+
+        found = {}
+        for folder in folders:
+            for path, st in find_dumps(folder):
+                found[path] = st
+
+        with self._lock:
+            self._load()
+            dumps, clusters = self._dumps, self._clusters
+
+            # Clusters that lost a dump get their counts redone from the rest
+            dirty = set()
+            fresh = []
+            for path in list(dumps):
+                st = found.get(path)
+                known = dumps[path]
+                if st is None or (st.st_size, st.st_mtime_ns) != (known["size"], known["mtime_ns"]):
+                    if known["cluster"] is not None:
+                        dirty.add(known["cluster"])
+                    del dumps[path]
+            for path, st in found.items():
+                if path not in dumps:
+                    fresh.append((path, st))
+
+            parsed = []
+            if fresh:
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(fresh)))) as pool:
+                    parsed = list(pool.map(lambda d: _parse(d[0]), fresh))
+
+            for (path, st), entry in zip(fresh, parsed):
+                record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "cluster": None, "time": None}
+                dumps[path] = record
+                if not entry["ok"]:
+                    continue
+
+                cluster, signature = crash_signature(entry)
+                when = entry["timestamp"] or st.st_mtime_ns / 1e9
+                record.update(cluster=cluster, time=when)
+
+                known = clusters.get(cluster)
+                if known is None:
+                    clusters[cluster] = dict(signature, count=1, first=when, last=when, sample=path)
+                elif cluster not in dirty:
+                    known["count"] += 1
+                    known["first"] = min(known["first"], when)
+                    if when >= known["last"]:
+                        known["last"], known["sample"] = when, path
+
+            if dirty:
+                self._recount(dirty)
+
+            if fresh or dirty:
+                self._save()
+
+            summary = {
+                "dumps": len(found),
+                "parsed": len(fresh),
+                "unreadable": sum(1 for path in found if dumps[path]["cluster"] is None),
+                "clusters": sorted(
+                    (dict(info, id=cluster) for cluster, info in clusters.items()),
+                    key=lambda c: (c["count"], c["last"]), reverse=True,
+                ),
+            }
+        return summary
+
+    def _recount(self, dirty):
+        totals = {cluster: None for cluster in dirty}
+        for path, record in self._dumps.items():
+            cluster = record["cluster"]
+            if cluster not in totals:
+                continue
+            when = record["time"]
+            total = totals[cluster]
+            if total is None:
+                totals[cluster] = [1, when, when, path]
+            else:
+                total[0] += 1
+                total[1] = min(total[1], when)
+                if when >= total[2]:
+                    total[2], total[3] = when, path
+
+        for cluster, total in totals.items():
+            if total is None:
+                self._clusters.pop(cluster, None)
+            else:
+                self._clusters[cluster].update(
+                    count=total[0], first=total[1], last=total[2], sample=total[3]
+                )
+
+
+_clusters = None
+_clusters_lock = threading.Lock()
+
+
+def get_crash_clusters():
+    global _clusters
+
+    with _clusters_lock:
+        if _clusters is None:
+            _clusters = CrashClusters()
+        return _clusters
@@ -0,0 +1,337 @@
+import errno
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.walk import walk_tree
+
+
+# -------------------------------
+#  Helper: Empty delete result
+# -------------------------------
+def new_delete_result(path):
+    """
+    Returns an empty delete result dict for a root path.
+    """
+    return {
+        "path": path,
+        "bytes": 0,       # bytes actually reclaimed
+        "files": 0,       # files removed
+        "dirs": 0,        # directories removed
+        "failed": {"locked": 0, "permission": 0, "vanished": 0, "changed": 0, "other": 0},
+        "failures": [],   # [(path, category)] for everything except 'vanished'
+        "in_use": 0,      # bytes a plan skipped as in use (see IN_USE_WINDOW)
+        "partial": False,
+    }
+
+
+# Windows error codes for "file is open in another process"
+_WIN_LOCKED = (32, 33)  # ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION
+
+
+def classify_error(e):
+    """
+    Maps an OSError from unlink/rmdir to 'locked', 'permission',
+    'vanished' or 'other'.
+    """
+    if isinstance(e, FileNotFoundError):
+        return "vanished"
+    if getattr(e, "winerror", None) in _WIN_LOCKED or e.errno in (errno.EBUSY, errno.ETXTBSY):
+        return "locked"
+    if isinstance(e, PermissionError):
+        return "permission"
+    return "other"
+
+
+def _is_dir_link(path):
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    attributes = getattr(st, "st_file_attributes", 0)
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT) and \
+        bool(attributes & stat.FILE_ATTRIBUTE_DIRECTORY)
+
+
+def _unlink(path):
+    """
+    os.remove, retrying once with the read-only flag cleared
+    (read-only files can't be deleted on Windows). A junction or
+    directory symlink os.remove refuses is removed with os.rmdir,
+    which takes away the link only.
+    """
+    try:
+        os.remove(path)
+    except OSError as e:
+        if _is_dir_link(path):
+            os.rmdir(path)
+            return
+        if not isinstance(e, PermissionError) or os.name != "nt" \
+                or getattr(e, "winerror", None) in _WIN_LOCKED:
+            raise
+        os.chmod(path, stat.S_IWRITE)
+        os.remove(path)
+
+
+# -------------------------------
+#  DELETE ENGINE
+# -------------------------------
+# Worker threads unlinking files
+DELETE_WORKERS = 4
+
+# Files per batch: bigger directories are split, so a flat folder
+# (%temp%) still spreads across the workers
+BATCH_FILES = 256
+
+
+def split_batch(files, size=BATCH_FILES):
+    """Yields one directory's files in chunks of at most `size`."""
+    for start in range(0, len(files), size):
+        yield files[start:start + size]
+
+
+def _record_failure(result, path, e):
+    category = classify_error(e)
+    result["failed"][category] += 1
+    if category != "vanished":
+        result["failures"].append((path, category))
+
+
+# Unlink relative to an open directory handle where the OS supports it
+# (POSIX). Windows has no dir_fd, so it uses full paths.
+DIR_FD_SUPPORTED = (
+    os.unlink in os.supports_dir_fd
+    and os.stat in os.supports_dir_fd
+    and hasattr(os, "O_DIRECTORY")
+)
+USE_DIR_FD = DIR_FD_SUPPORTED
+
+
+def _delete_batch(files, token=None, limiter=None):
+    """
+    Unlinks a batch of files from one directory: [(path, size)] or, for planned
+    deletes, [(path, size, mtime_ns)]. Planned files whose size or
+    mtime changed since planning are left alone and counted as 'changed'.
+
+    Batches hold the files of a single directory, so where supported
+    that directory is opened once and every file is unlinked by name
+    relative to it, instead of resolving the full path each time.
+
+    limiter (optional) is the IOLimiter of a throttled clean (see
+    throttle.py): each unlink is charged as one operation plus the
+    bytes it frees.
+
+    Returns a partial delete result.
+    """
+    result = new_delete_result(None)
+
+    dir_fd = None
+    parent = os.path.dirname(files[0][0]) if files else None
+    if USE_DIR_FD and parent:
+        try:
+            dir_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            dir_fd = None
+
+    try:
+        for entry in files:
+            if token and token.cancelled:
+                result["partial"] = True
+                break
+
+            path, size = entry[0], entry[1]
+            name = os.path.basename(path)
+            if limiter:
+                limiter.charge(1, size)
+            relative = dir_fd is not None and os.path.dirname(path) == parent
+
+            try:
+                if len(entry) > 2:
+                    if relative:
+                        st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+                    else:
+                        st = os.lstat(path)
+                    if st.st_size != size or st.st_mtime_ns != entry[2]:
+                        result["failed"]["changed"] += 1
+                        result["failures"].append((path, "changed"))
+                        continue
+
+                if relative:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    _unlink(path)
+            except OSError as e:
+                _record_failure(result, path, e)
+                continue
+
+            result["bytes"] += size
+            result["files"] += 1
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+    return result
+
+
+def _walk_batches(path, result, dirs, token=None):
+    """
+    Lists the tree under path (see walk_tree: symlinks and junctions
+    are deleted as themselves, never entered), yielding each
+    directory's files as batches of (path, size, mtime_ns) (see split_batch) and
+    appending every directory to dirs in discovery order (parents
+    before children). Listing errors go into result.
+    """
+    on_error = lambda failed, e: _record_failure(result, failed, e)
+
+    for current, entries in walk_tree(path, token, on_error):
+        dirs.append(current)
+        batch = []
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+                batch.append((entry.path, st.st_size, st.st_mtime_ns))
+            except OSError as e:
+                _record_failure(result, entry.path, e)
+        yield from split_batch(batch)
+
+    if token and token.cancelled:
+        result["partial"] = True
+
+
+def run_batches(batches, result, workers=DELETE_WORKERS, token=None, progress=None, on_batch=None,
+                limiter=None):
+    """
+    Deletes an iterable of file batches (see _delete_batch) into result.
+
+    Batches go to a thread pool as they come, so a lazy walk keeps
+    listing while earlier batches are unlinked. workers <= 1 deletes
+    inline on the calling thread (background purges).
+
+    on_batch (optional) is called with a batch's position in batches
+    once it was worked through completely (used by the clean journal).
+    limiter (optional) is passed to every batch (see _delete_batch).
+    """
+    futures = []
+
+    def merge(index, part):
+        result["bytes"] += part["bytes"]
+        result["files"] += part["files"]
+        result["partial"] = result["partial"] or part["partial"]
+        for category, count in part["failed"].items():
+            result["failed"][category] += count
+        result["failures"].extend(part["failures"])
+        if on_batch and not part["partial"]:
+            on_batch(index)
+
+    pool = None
+    if workers > 1:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="delete")
+
+    try:
+        for index, batch in enumerate(batches):
+            if token and token.cancelled:
+                result["partial"] = True
+                break
+
+            if pool is None:
+                merge(index, _delete_batch(batch, token, limiter))
+            else:
+                futures.append((index, pool.submit(_delete_batch, batch, token, limiter)))
+
+            # Merge finished batches as we go so progress numbers move
+            while futures and futures[0][1].done():
+                done_index, fut = futures.pop(0)
+                merge(done_index, fut.result())
+            if progress:
+                progress.poll(lambda: (result["files"], result["bytes"]))
+
+        for done_index, fut in futures:
+            merge(done_index, fut.result())
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def remove_dirs(root, dirs, result, keep_root=True):
+    """
+    Removes directories bottom-up. dirs must list parents before
+    their children (discovery order); non-empty ones are left alone.
+    """
+    for current in reversed(dirs):
+        if keep_root and current == root:
+            continue
+        try:
+            os.rmdir(current)
+            result["dirs"] += 1
+        except OSError:
+            # Not empty (a file in it failed or was never reached),
+            # locked, or already gone; left alone
+            pass
+
+
+def delete_tree(path, workers=DELETE_WORKERS, keep_root=True, token=None, progress=None,
+                journal=None, limiter=None):
+    """
+    Deletes everything under path and reports exactly what went.
+
+    The tree is listed once with os.scandir; each directory's files go
+    to a thread pool in batches, so unlinks overlap while the walk
+    carries on. Once every batch is done, directories are removed
+    bottom-up (deepest first); a directory that still holds a file
+    that could not be deleted simply stays.
+
+    keep_root: leave path itself in place (cache / temp folders).
+    token (optional) is a CancelToken; a stopped run returns what it
+    removed so far with 'partial' = True.
+    progress (optional) is a ProgressThrottle fed with removed files/bytes.
+    journal (optional) is a Journal; every batch is recorded as it is
+    handed out, so an interrupted run can be finished on the next start
+    (only the files found here, see resume_unfinished).
+    limiter (optional) is an IOLimiter, resolved once by the caller for
+    user-started cleans (see current_limiter).
+
+    Returns:
+        { 'path', 'bytes', 'files', 'dirs', 'failed', 'failures', 'partial' }
+        failed = { 'locked', 'permission', 'vanished', 'changed', 'other' } counts
+    """
+    result = new_delete_result(path)
+    if not os.path.isdir(path):
+        return result
+
+    dirs = []
+    job = journal.begin_tree(path, keep_root) if journal else None
+
+    def batches():
+        for seq, batch in enumerate(_walk_batches(path, result, dirs, token)):
+            if job:
+                journal.batch(job, seq, batch)
+            # Just listed, so no need to check size / mtime again
+            yield [f[:2] for f in batch]
+
+    try:
+        run_batches(batches(), result, workers, token, progress,
+                    (lambda seq: journal.done(job, seq)) if job else None, limiter)
+        remove_dirs(path, dirs, result, keep_root)
+    finally:
+        if job:
+            journal.end(job)
+
+    if progress:
+        progress.finish(result)
+
+    return result
+
+
+def describe_failures(result):
+    """
+    Short text like "3 locked, 1 permission denied" (empty if none).
+    """
+    names = {
+        "locked": "locked",
+        "permission": "permission denied",
+        "vanished": "already gone",
+        "changed": "changed since preview",
+        "other": "other errors",
+    }
+    parts = [f"{count} {names[key]}" for key, count in result["failed"].items() if count]
+    return ", ".join(parts)
@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+import time
+
+from app.utils.paths import app_data_dir
+from app.utils.clean_plan import TargetPlan, execute_target
+
+
+JOURNAL_FILE = "clean_journal.jsonl"
+
+# Completed-batch marks are buffered and written together, at most
+# this many per line and at least every FLUSH_INTERVAL seconds
+FLUSH_EVERY = 256
+FLUSH_INTERVAL = 0.5
+
+
+class Journal:
+    """
+    Append-only log of running cleans, so a clean interrupted by a
+    crash or kill can be finished on the next start without walking
+    the folders again.
+
+    One JSON object per line:
+        {"op": "begin", "id", "kind": "plan" | "tree", "label", "path", "keep_root", "dirs"}
+        {"op": "batch", "id", "seq", "files": [[path, size, mtime_ns], ...]}
+        {"op": "done",  "id", "seqs": [...]}     completed batches
+        {"op": "end",   "id"}
+    kind "tree" jobs (delete everything under path, see delete_tree)
+    record their batches as the walk finds them and have no "dirs".
+
+    Batches are recorded as they are handed to the delete workers, and
+    marked done when finished; both are buffered (see FLUSH_EVERY), so
+    a clean never waits for the whole file list to be written. Resuming
+    only deletes recorded files whose size and mtime still match: a
+    kill can lose the last few lines, which means a batch is either
+    not resumed (its files stay) or tried again (they count as
+    vanished). Lines are flushed to the OS, not fsync'ed: enough to
+    survive the app dying.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), JOURNAL_FILE)
+        self._lock = threading.Lock()
+        self._pending = {}     # job id -> [seq] not written yet
+        self._batches = []     # batch lines not written yet
+        self._last_flush = time.monotonic()
+        self._open_jobs = set()
+
+        # Jobs left by an earlier run keep the file alive until resumed
+        self._leftovers = bool(self.unfinished())
+
+    # ---------------------------------
+    # Writing
+    # ---------------------------------
+    def _append(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(line, separators=(",", ":")) + "\n" for line in lines)
+
+    def begin_plan(self, target, keep_root=True):
+        """
+        Records that a TargetPlan starts running (its batches follow
+        through batch()). Returns the job id.
+        """
+        job = f"{time.time_ns()}-{id(target)}"
+        with self._lock:
+            self._append([{
+                "op": "begin", "id": job, "kind": "plan",
+                "label": target.label, "path": target.path, "keep_root": keep_root,
+                "dirs": [d for d, _ in target.dirs],
+            }])
+            self._open_jobs.add(job)
+        return job
+
+    def begin_tree(self, path, keep_root=True):
+        """
+        Records a delete-everything job (delete_tree). Returns the job id.
+        """
+        job = f"{time.time_ns()}-tree"
+        with self._lock:
+            self._append([{"op": "begin", "id": job, "kind": "tree",
+                           "path": path, "keep_root": keep_root}])
+            self._open_jobs.add(job)
+        return job
+
+    def batch(self, job, seq, files):
+        """
+        Records one batch [(path, size, mtime_ns)] about to be deleted (buffered).
+        """
+        with self._lock:
+            self._batches.append({"op": "batch", "id": job, "seq": seq,
+                                  "files": [list(f) for f in files]})
+            if len(self._batches) >= FLUSH_EVERY or \
+                    time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+
+    def done(self, job, seq):
+        """
+        Marks one batch of a job finished (buffered).
+        """
+        with self._lock:
+            seqs = self._pending.setdefault(job, [])
+            seqs.append(seq)
+            if len(seqs) >= FLUSH_EVERY or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        # Batches first: a "done" is only read for a batch already seen
+        lines = self._batches + [{"op": "done", "id": job, "seqs": seqs}
+                                 for job, seqs in self._pending.items() if seqs]
+        self._batches = []
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+        if lines:
+            self._append(lines)
+
+    def end(self, job):
+        """
+        Closes a job. Once nothing is open the journal is emptied.
+        """
+        with self._lock:
+            self._pending.pop(job, None)
+            self._batches = [line for line in self._batches if line["id"] != job]
+            self._open_jobs.discard(job)
+            if self._open_jobs or self._leftovers:
+                self._flush_locked()
+                self._append([{"op": "end", "id": job}])
+            else:
+                self._pending.clear()
+                self._batches = []
+                self._reset_locked()
+
+    def _reset_locked(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # ---------------------------------
+    # Reading
+    # ---------------------------------
+    def unfinished(self):
+        """
+        Jobs that began but never ended, with their remaining batches.
+
+        Returns:
+            list of dicts { 'id', 'kind', 'label', 'path', 'keep_root',
+                            'dirs', 'batches': [(seq, [(path, size, mtime_ns)])] }
+        """
+        jobs = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        line = json.loads(raw)
+                    except ValueError:
+                        continue  # torn last line from a kill
+
+                    job = jobs.get(line.get("id"))
+                    op = line.get("op")
+                    if op == "begin":
+                        jobs[line["id"]] = dict(line, batches={}, done=set())
+                    elif job is None:
+                        continue
+                    elif op == "batch":
+                        job["batches"][line["seq"]] = [tuple(x) for x in line["files"]]
+                    elif op == "done":
+                        job["done"].update(line["seqs"])
+                    elif op == "end":
+                        jobs.pop(line["id"], None)
+        except OSError:
+            return []
+
+        unfinished = []
+        for job in jobs.values():
+            remaining = [
+                (seq, files) for seq, files in sorted(job["batches"].items())
+                if seq not in job["done"]
+            ]
+            unfinished.append({
+                "id": job["id"],
+                "kind": job.get("kind", "plan"),
+                "label": job.get("label", ""),
+                "path": job["path"],
+                "keep_root": job.get("keep_root", True),
+                "dirs": job.get("dirs", []),
+                "batches": remaining,
+            })
+        return unfinished
+
+    def clear(self):
+        """
+        Drops everything written by earlier runs (after resuming them).
+        """
+        with self._lock:
+            self._leftovers = False
+            if not self._open_jobs:
+                self._pending.clear()
+                self._batches = []
+                self._reset_locked()
+
+
+# -------------------------------
+#  Shared journal
+# -------------------------------
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    global _journal
+
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+        return _journal
+
+
+def resume_unfinished(journal=None):
+    """
+    Finishes cleans that were interrupted (app killed / crashed) using
+    the journal, without re-planning. Call once at startup.
+
+    Only the recorded files are deleted, and only while their size and
+    mtime still match: anything created since (the game recreating its
+    cache, a new temp file) is left alone.
+
+    Returns:
+        list of delete results, one per resumed job
+    """
+    journal = journal or get_journal()
+    results = []
+
+    for job in journal.unfinished():
+        if not os.path.isdir(job["path"]):
+            continue
+
+        dirs = job["dirs"]
+        if job["kind"] == "tree":
+            # Folders of the recorded files, parents first
+            dirs = {job["path"]}
+            for _, files in job["batches"]:
+                dirs.update(os.path.dirname(f[0]) for f in files)
+            dirs = sorted(dirs, key=len)
+
+        target = TargetPlan(
+            label=job["label"],
+            path=job["path"],
+            batches=tuple(tuple(files) for _, files in job["batches"]),
+            dirs=tuple((d, 0) for d in dirs),
+            skipped=(),
+            files=sum(len(files) for _, files in job["batches"]),
+            bytes=sum(f[1] for _, files in job["batches"] for f in files),
+            skipped_bytes=0,
+        )
+        result = execute_target(target, keep_root=job["keep_root"])
+
+        print(f"Resumed interrupted clean of {job['path']}: {result['files']} files removed.")
+        results.append(result)
+        journal.end(job["id"])
+
+    journal.clear()
+    return results
@@ -0,0 +1,315 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+
+from app.utils.paths import app_data_dir
+
+
+LOG_DIR = r"%localappdata%\FiveM\FiveM.app\logs"
+
+# Parsed results per log file, reused while (size, mtime) match
+CACHE_FILE = "log_analysis.json"
+
+# Longest piece of a line looked at around a keyword (binary junk guard)
+MAX_LINE = 2048
+
+# The file is mapped this much at a time (plus MARGIN on both sides for
+# lines crossing the edge), so resident memory stays bounded
+WINDOW = 64 * 1024 * 1024
+MARGIN = 64 * 1024
+
+# Characters kept of a normalised signature
+SIGNATURE_LENGTH = 160
+
+
+# -------------------------------
+#  PATTERNS
+# -------------------------------
+# Candidate lines are found with one pass per plain literal (re's fast
+# literal search, ~1 GB/s; an alternation is ~40x slower); everything
+# else is done on the few matching lines only. "RROR" covers SCRIPT ERROR.
+KEYWORD_PATTERNS = [re.compile(k) for k in (rb"rror", rb"RROR", rb"arning", rb"ARNING")]
+
+SCRIPT_ERROR_RE = re.compile(rb"SCRIPT ERROR")
+ERROR_RE = re.compile(rb"\b(?:[Ee]rror|ERROR)\b")
+WARNING_RE = re.compile(rb"\b(?:[Ww]arning|WARNING)\b")
+
+# "[    123456] [b2699_GTAProcess]   MainThrd/ text"  (tick = ms since launch)
+PREFIX_RE = re.compile(rb"^\[\s*(\d+)\]\s*(?:\[[^\]]*\]\s*)?(?:[\w ]+/\s?)?")
+TICK_RE = re.compile(rb"^\[\s*(\d+)\]", re.M)
+
+COLOR_RE = re.compile(r"\^\d")
+HEX_RE = re.compile(r"0x[0-9a-fA-F]+")
+NUMBER_RE = re.compile(r"(?<![:\w])\d+(?:\.\d+)?(?!x\?)")
+SPACE_RE = re.compile(r"\s+")
+
+# CitizenFX_log_2024-05-01T201530.log
+FILE_TIME_RE = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{6})")
+
+
+def normalize(text):
+    """
+    Signature of a log message: colour codes stripped, addresses and
+    counters replaced, so repeats of the same problem group together.
+    Script line numbers ("@res/client.lua:12:") are kept.
+    """
+    text = COLOR_RE.sub("", text)
+    text = HEX_RE.sub("0x?", text)
+    text = NUMBER_RE.sub("#", text)
+    return SPACE_RE.sub(" ", text).strip()[:SIGNATURE_LENGTH]
+
+
+def _classify(line):
+    if SCRIPT_ERROR_RE.search(line):
+        return "script error"
+    if ERROR_RE.search(line):
+        return "error"
+    if WARNING_RE.search(line):
+        return "warning"
+    return None
+
+
+# -------------------------------
+#  SINGLE FILE
+# -------------------------------
+def scan_log(path):
+    """
+    Memory-maps one log file, WINDOW bytes at a time, and collects its
+    error, warning and script-error signatures. Memory use doesn't
+    depend on the file size: only matching lines are copied out.
+
+    Returns:
+        { 'size', 'mtime_ns', 'last_tick',
+          'signatures': { key: [kind, signature, count, first_tick, last_tick, sample] } }
+        ticks are ms since the game started (None if the line had none)
+    """
+    signatures = {}
+
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        entry = {"size": size, "mtime_ns": st.st_mtime_ns,
+                 "last_tick": None, "signatures": signatures}
+
+        done_until = 0  # absolute end of the last line handled
+        for offset in range(0, size, WINDOW):
+            base = max(0, offset - MARGIN)
+            length = min(size, offset + WINDOW + MARGIN) - base
+
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=base) as mm:
+                lo = offset - base
+                hi = min(size, offset + WINDOW) - base
+
+                # line start -> line end (relative), for keywords starting in this window
+                lines = {}
+                for pattern in KEYWORD_PATTERNS:
+                    endpos = min(length, hi + len(pattern.pattern) - 1)
+                    for m in pattern.finditer(mm, lo, endpos):
+                        at = m.start()
+                        low = max(0, at - MAX_LINE)
+                        newline = mm.rfind(b"\n", low, at)
+                        start = newline + 1 if newline != -1 else low
+                        if start in lines or base + start < done_until:
+                            continue
+                        end = mm.find(b"\n", at, at + MAX_LINE)
+                        lines[start] = end if end != -1 else min(length, at + MAX_LINE)
+
+                for start in sorted(lines):
+                    if base + start < done_until:
+                        continue
+                    end = lines[start]
+                    done_until = base + end + 1
+                    _record(signatures, mm[start:end])
+
+                if offset + WINDOW >= size:
+                    # Last tick of the file, for dating logs without a timestamp name
+                    ticks = TICK_RE.findall(mm, max(0, length - 64 * 1024))
+                    if ticks:
+                        entry["last_tick"] = int(ticks[-1])
+
+    return entry
+
+
+def _record(signatures, line):
+    kind = _classify(line)
+    if kind is None:
+        return
+
+    prefix = PREFIX_RE.match(line)
+    tick = int(prefix.group(1)) if prefix else None
+    message = line[prefix.end():] if prefix else line
+    text = message.decode("utf-8", "replace").rstrip()
+
+    signature = normalize(text)
+    key = f"{kind}|{signature}"
+    record = signatures.get(key)
+    if record is None:
+        signatures[key] = [kind, signature, 1, tick, tick, text[:300]]
+    else:
+        record[2] += 1
+        if tick is not None:
+            if record[3] is None:
+                record[3] = tick
+            record[4] = tick
+
+
+def log_start_time(path, entry):
+    """
+    When the game session that wrote this log started (epoch seconds):
+    from the file name if it has a timestamp, else mtime minus the
+    last tick.
+    """
+    m = FILE_TIME_RE.search(os.path.basename(path))
+    if m:
+        try:
+            return time.mktime(time.strptime(m.group(1), "%Y-%m-%dT%H%M%S"))
+        except ValueError:
+            pass
+    return entry["mtime_ns"] / 1e9 - (entry["last_tick"] or 0) / 1000
+
+
+# -------------------------------
+#  CACHE
+# -------------------------------
+class LogCache:
+    """
+    Parsed per-file results (log entries, see scan_log; crash dumps use
+    it too) saved as JSON in the app data folder, keyed by path and
+    reused as long as size and mtime match.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), CACHE_FILE)
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = dict(json.load(f))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, path, size, mtime_ns):
+        with self._lock:
+            entry = self._load().get(path)
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            return entry
+        return None
+
+    def put(self, path, entry):
+        with self._lock:
+            self._load()[path] = entry
+
+    def save(self, folder=None, keep=()):
+        """
+        Writes the cache. Entries of files under `folder` that are not
+        in `keep` (deleted files) are dropped first.
+        """
+        with self._lock:
+            entries = self._load()
+            if folder is not None:
+                keep = set(keep)
+                prefix = folder.rstrip("\\/") + os.sep
+                for path in [p for p in entries if p.startswith(prefix)]:
+                    if path not in keep:
+                        del entries[path]
+            temp = self.path + ".tmp"
+            try:
+                with open(temp, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, separators=(",", ":"))
+                os.replace(temp, self.path)
+            except OSError as e:
+                print(f"Failed to save log analysis cache: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_log_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LogCache()
+        return _cache
+
+
+# -------------------------------
+#  FOLDER ANALYSIS
+# -------------------------------
+def analyze_logs(folder=None, token=None, cache=None):
+    """
+    Error / warning / script-error signatures over every .log file in
+    the FiveM logs folder. Unchanged files come from the cache.
+
+    Returns:
+        { 'files', 'bytes', 'parsed': files actually read this time,
+          'signatures': [ { 'kind', 'signature', 'count', 'files',
+                            'first_seen', 'last_seen', 'sample' } ]  (most frequent first) }
+        first_seen / last_seen are epoch seconds
+    """
+    folder = folder or os.path.expandvars(LOG_DIR)
+    cache = cache or get_log_cache()
+    summary = {"files": 0, "bytes": 0, "parsed": 0, "signatures": []}
+
+    try:
+        names = [n for n in os.listdir(folder) if n.lower().endswith(".log")]
+    except OSError:
+        return summary
+
+    merged = {}
+    seen = []
+    for name in sorted(names):
+        if token and token.cancelled:
+            break
+
+        path = os.path.join(folder, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+
+        entry = cache.get(path, st.st_size, st.st_mtime_ns)
+        if entry is None:
+            try:
+                entry = scan_log(path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to read log {path}: {e}")
+                continue
+            cache.put(path, entry)
+            summary["parsed"] += 1
+
+        seen.append(path)
+        summary["files"] += 1
+        summary["bytes"] += entry["size"]
+
+        started = log_start_time(path, entry)
+        modified = entry["mtime_ns"] / 1e9
+        for key, (kind, signature, count, first, last, sample) in entry["signatures"].items():
+            first_seen = started + first / 1000 if first is not None else started
+            last_seen = started + last / 1000 if last is not None else modified
+
+            total = merged.get(key)
+            if total is None:
+                merged[key] = {
+                    "kind": kind, "signature": signature, "count": count, "files": 1,
+                    "first_seen": first_seen, "last_seen": last_seen, "sample": sample,
+                }
+            else:
+                total["count"] += count
+                total["files"] += 1
+                total["first_seen"] = min(total["first_seen"], first_seen)
+                total["last_seen"] = max(total["last_seen"], last_seen)
+
+    # A stopped run keeps the old entries of files it didn't reach
+    cache.save(None if token and token.cancelled else folder, seen)
+
+    summary["signatures"] = sorted(merged.values(), key=lambda s: s["count"], reverse=True)
+    return summary
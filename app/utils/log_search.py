@@ -0,0 +1,431 @@
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from app.utils.paths import app_data_dir
+from app.utils.log_analysis import LOG_DIR
+from app.utils.walk import list_files
+
+
+CRASH_REPORTS_DIR = r"%localappdata%\FiveM\FiveM.app\crash-reports"
+
+SEARCH_DIRS = {
+    "FiveM Logs": LOG_DIR,
+    "Crash Reports": CRASH_REPORTS_DIR,
+}
+
+SEARCH_INDEX_FILE = "log_search.db"
+
+# Bytes read at a time while indexing
+READ_SIZE = 16 * 1024 * 1024
+
+# Files with more distinct words than this (binary junk) aren't indexed
+# and are simply always searched
+MAX_TOKENS = 500_000
+
+# Distinct lines remembered per file while indexing (a shortcut only:
+# log lines repeat a lot once digits are folded)
+MAX_LINES = 1_000_000
+
+# Bytes hashed at the start of a file to tell appends from rewrites
+HEAD_BYTES = 4096
+
+MAX_RESULTS = 500
+
+
+# -------------------------------
+#  TRIGRAMS
+#
+#  Text is folded to a 28-symbol alphabet (a-z, every digit -> "0",
+#  "_"); everything else separates words. Trigrams are taken inside
+#  words only, so there are 28**3 possible ones and each file's set is
+#  stored exactly as a 21952-bit bitmap (~2.7 KB, less compressed).
+# -------------------------------
+SYMBOLS = 28
+N_GRAMS = SYMBOLS ** 3
+SEP = bytes([SYMBOLS])
+NL = bytes([SYMBOLS + 1])
+
+# byte -> symbol code (0-25 letters, 26 digits, 27 "_", 28 separator, 29 newline)
+_fold = bytearray(SEP * 256)
+for _c in range(26):
+    _fold[ord("a") + _c] = _c
+    _fold[ord("A") + _c] = _c
+for _c in range(10):
+    _fold[ord("0") + _c] = 26
+_fold[ord("_")] = 27
+_fold[ord("\n")] = SYMBOLS + 1
+FOLD = bytes(_fold)
+
+
+def gram_bits(grams):
+    """
+    Bitmap (int) of a set of trigrams ((a, b, c) symbol codes; ones
+    containing the separator are ignored).
+    """
+    bitmap = bytearray(N_GRAMS // 8 + 1)
+    for a, b, c in grams:
+        if a < SYMBOLS and b < SYMBOLS and c < SYMBOLS:
+            n = (a * SYMBOLS + b) * SYMBOLS + c
+            bitmap[n >> 3] |= 1 << (n & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+def _add_words(words, grams):
+    """Adds the trigrams of folded words (the set/zip work runs in C)."""
+    joined = SEP.join(w for w in words if len(w) >= 3)
+    grams.update(zip(joined, joined[1:], joined[2:]))
+
+
+def file_grams(path, start=0):
+    """
+    Trigram set of a file from byte `start` on (start > 0 resumes after an
+    append: reading begins at the word that was cut off).
+
+    Returns:
+        set of trigrams (see gram_bits), or None if the file has too many
+        distinct words to be worth indexing
+    """
+    grams, seen, seen_lines = set(), set(), set()
+
+    with open(path, "rb") as f:
+        carry = b""
+        if start:
+            f.seek(max(0, start - HEAD_BYTES))
+            head = f.read(start - max(0, start - HEAD_BYTES)).translate(FOLD)
+            cut = max(head.rfind(SEP), head.rfind(NL))
+            carry = head[cut + 1:]
+
+        while True:
+            chunk = f.read(READ_SIZE)
+            text = carry + chunk.translate(FOLD)
+            if not chunk:
+                cut = len(text)
+            else:
+                cut = text.rfind(NL)
+                if cut == -1:
+                    cut = text.rfind(SEP)
+                if cut == -1 and len(text) > READ_SIZE:
+                    return None  # one endless "word": binary, not worth indexing
+            carry = text[cut + 1:]
+
+            # Distinct new lines first, then their distinct new words
+            lines = set(text[:cut + 1].split(NL))
+            lines -= seen_lines
+            if len(seen_lines) > MAX_LINES:
+                seen_lines.clear()
+            seen_lines |= lines
+
+            words = set(SEP.join(lines).split(SEP))
+            words -= seen
+            seen |= words
+            if len(seen) > MAX_TOKENS:
+                return None
+            _add_words(words, grams)
+
+            if not chunk:
+                return grams
+
+
+def _head_crc(path, length):
+    with open(path, "rb") as f:
+        return zlib.crc32(f.read(length))
+
+
+# -------------------------------
+#  QUERY PLANNING
+# -------------------------------
+def required_literals(items):
+    """
+    Literal strings every match of a parsed regex must contain
+    (classes, optional parts and nested alternations contribute
+    nothing). An empty list means no pruning.
+    """
+    runs, current = [], []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+        if op is sre_parse.SUBPATTERN:
+            runs.extend(required_literals(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            runs.extend(required_literals(av[2]))
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def _literal_mask(literals):
+    grams = set()
+    for literal in literals:
+        _add_words(literal.encode("utf-8").translate(FOLD).split(SEP), grams)
+    return gram_bits(grams) if grams else 0
+
+
+def query_masks(pattern):
+    """
+    Trigram bitmaps for a regex: a file can only match if it contains
+    every trigram of at least one mask. A top-level alternation
+    ("a|b") gives one mask per branch; a 0 mask matches every file.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return [0]
+
+    if len(parsed) == 1 and parsed[0][0] is sre_parse.BRANCH:
+        masks = [_literal_mask(required_literals(branch)) for branch in parsed[0][1][1]]
+        return [0] if 0 in masks else masks
+    return [_literal_mask(required_literals(parsed))]
+
+
+# -------------------------------
+#  INDEX
+# -------------------------------
+class LogSearchIndex:
+    """
+    Persistent trigram index over the FiveM logs and crash reports
+    (SQLite, under the user profile).
+
+    One row per file:
+        path, size, mtime_ns, head (crc32 of the first HEAD_BYTES),
+        grams (zlib'ed trigram bitmap, NULL = not indexable)
+
+    Files are re-indexed only when size or mtime changed; a file that
+    only grew (same head) has just its new bytes indexed.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(app_data_dir(), SEARCH_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._files = None   # path -> [size, mtime_ns, head, bitmap int or None]
+
+        self.conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER,"
+                " mtime_ns INTEGER,"
+                " head INTEGER,"
+                " grams BLOB)"
+            )
+
+    def _load(self):
+        if self._files is None:
+            self._files = {}
+            rows = self.conn.execute("SELECT path, size, mtime_ns, head, grams FROM files")
+            for path, size, mtime_ns, head, grams in rows:
+                bits = int.from_bytes(zlib.decompress(grams), "little") if grams else None
+                self._files[path] = [size, mtime_ns, head, bits]
+        return self._files
+
+    def _index_file(self, path, st, old):
+        """
+        Returns the new [size, mtime_ns, head, bits] entry for a changed file.
+        """
+        head = _head_crc(path, min(st.st_size, HEAD_BYTES))
+
+        # Appended to: same beginning, only bigger
+        if old and old[3] is not None and st.st_size > old[0] and \
+                _head_crc(path, min(old[0], HEAD_BYTES)) == old[2]:
+            grams = file_grams(path, start=old[0])
+            bits = None if grams is None else old[3] | gram_bits(grams)
+        else:
+            grams = file_grams(path)
+            bits = None if grams is None else gram_bits(grams)
+
+        return [st.st_size, st.st_mtime_ns, head, bits]
+
+    def refresh(self, folders, token=None):
+        """
+        Brings the index up to date with the files under `folders`.
+
+        Returns:
+            { 'files', 'indexed', 'removed' }
+        """
+        stats = {"files": 0, "indexed": 0, "removed": 0}
+        found = {}
+
+        for folder in folders:
+            found.update(list_files(folder, token=token))
+
+        with self._lock:
+            files = self._load()
+            updates = []
+
+            for path, st in found.items():
+                if token and token.cancelled:
+                    break
+                old = files.get(path)
+                if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    continue
+                try:
+                    entry = self._index_file(path, st, old)
+                except OSError as e:
+                    print(f"Failed to index {path}: {e}")
+                    continue
+
+                files[path] = entry
+                grams = zlib.compress(entry[3].to_bytes(N_GRAMS // 8 + 1, "little")) \
+                    if entry[3] is not None else None
+                updates.append((path, entry[0], entry[1], entry[2], grams))
+
+            # Only files under the refreshed folders can be judged gone
+            roots = tuple(f.rstrip("\\/") + os.sep for f in folders)
+            gone = [p for p in files if p.startswith(roots) and p not in found]
+            for path in gone:
+                del files[path]
+
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", updates)
+                self.conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in gone))
+
+        stats["files"] = len(found)
+        stats["indexed"] = len(updates)
+        stats["removed"] = len(gone)
+        return stats
+
+    def candidates(self, pattern, folders):
+        """
+        Files under `folders` that may match the regex (all others
+        certainly don't).
+        """
+        masks = query_masks(pattern)
+        roots = tuple(f.rstrip("\\/") + os.sep for f in folders)
+
+        with self._lock:
+            files = self._load()
+            return sorted(
+                path for path, (_, _, _, bits) in files.items()
+                if path.startswith(roots)
+                and (bits is None or any(bits & mask == mask for mask in masks))
+            )
+
+
+# -------------------------------
+#  Shared index
+# -------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Returns the shared LogSearchIndex, or None if it can't be opened
+    (searches then check every file).
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = LogSearchIndex()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Log search index unavailable: {e}")
+                _index = False
+        return _index or None
+
+
+# -------------------------------
+#  SEARCH
+# -------------------------------
+def _count_newlines(mm, start, end):
+    count = 0
+    while start < end:
+        stop = min(end, start + READ_SIZE)
+        count += mm[start:stop].count(b"\n")
+        start = stop
+    return count
+
+
+def _verify(path, regex, matches, limit):
+    """
+    Runs the regex over one memory-mapped file, appending
+    (path, line number, line) to matches up to `limit`.
+    Returns True if the file matched at all.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(matches) >= limit:
+                return regex.search(mm) is not None
+
+            found = False
+            line_no, counted = 1, 0
+            for m in regex.finditer(mm):
+                found = True
+                line_no += _count_newlines(mm, counted, m.start())
+                counted = m.start()
+
+                start = mm.rfind(b"\n", 0, m.start()) + 1
+                end = mm.find(b"\n", m.start())
+                end = end if end != -1 else len(mm)
+                text = mm[start:min(end, start + 300)].decode("utf-8", "replace").rstrip("\r")
+                matches.append((path, line_no, text))
+                if len(matches) >= limit:
+                    break
+            return found
+
+
+def search_logs(pattern, folders=None, ignore_case=True, limit=MAX_RESULTS, token=None):
+    """
+    Regex search across the FiveM logs and crash reports: the trigram
+    index is refreshed (new / changed files only), files that can't
+    match are pruned, and the rest are verified with the real regex
+    over a memory map.
+
+    Raises re.error for an invalid pattern.
+
+    Returns:
+        { 'files', 'indexed', 'candidates', 'matched_files',
+          'matches': [(path, line number, line)], 'truncated', 'elapsed' }
+    """
+    started = time.perf_counter()
+    regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0)
+    folders = [os.path.expandvars(f) for f in (folders or SEARCH_DIRS.values())]
+
+    index = get_search_index()
+    if index is not None:
+        stats = index.refresh(folders, token)
+        candidates = index.candidates(pattern, folders)
+    else:
+        stats = {"files": 0, "indexed": 0}
+        candidates = []
+        for folder in folders:
+            candidates.extend(path for path, _ in list_files(folder, token=token))
+        stats["files"] = len(candidates)
+
+    matches = []
+    matched_files = 0
+    for path in candidates:
+        if token and token.cancelled:
+            break
+        try:
+            if _verify(path, regex, matches, limit):
+                matched_files += 1
+        except (OSError, ValueError):
+            continue
+
+    return {
+        "files": stats["files"],
+        "indexed": stats["indexed"],
+        "candidates": len(candidates),
+        "matched_files": matched_files,
+        "matches": matches,
+        "truncated": len(matches) >= limit,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,253 @@
+import bisect
+import mmap
+import os
+from collections import OrderedDict
+
+from app.utils.log_analysis import LOG_DIR
+
+
+# Indexing unit: the log is indexed backwards from the end in blocks of
+# about this size (cut at line starts), only as far as the user scrolls
+BLOCK_SIZE = 1024 * 1024
+
+# Blocks whose exact line offsets are kept (the visible ones)
+OFFSET_CACHE_BLOCKS = 16
+
+# Characters shown of one line
+MAX_LINE_CHARS = 4096
+
+
+def current_log(folder=None):
+    """
+    The log FiveM is writing (most recently modified .log), or None.
+    """
+    folder = folder or os.path.expandvars(LOG_DIR)
+    newest, newest_mtime = None, -1
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(".log"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                if mtime > newest_mtime:
+                    newest, newest_mtime = entry.path, mtime
+    except OSError:
+        return None
+    return newest
+
+
+class LineIndex:
+    """
+    Lazy line index over a (possibly huge, growing) log file.
+
+    The file is memory-mapped and indexed from the end: only the line
+    *count* of each block is computed (one C-speed count per block), and
+    exact line offsets are worked out for a block only when one of its
+    lines is displayed. Opening a 1 GB log touches just the last block.
+
+    Row 0 is the first line of the indexed region [origin, size); the
+    region grows towards the start with scan_back()/add_front() and
+    towards the end with scan_growth()/apply_growth(). Both are split in
+    two so a Qt model can announce the change before it happens.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._mm = None
+        self._identity = None
+        self.size = 0
+        self.origin = 0
+        self.lines = 0
+        self._blocks = []       # [(start, end, line count)] in file order
+        self._firsts = []       # first row of each block
+        self._offsets = OrderedDict()
+        self.open()
+
+    # ---------------------------------
+    # File handling
+    # ---------------------------------
+    def open(self):
+        self.close()
+        self._file = open(self.path, "rb")
+        st = os.fstat(self._file.fileno())
+        self._identity = (st.st_dev, st.st_ino)
+        self.size = st.st_size
+        self.origin = self.size
+        self.lines = 0
+        self._blocks = []
+        self._firsts = []
+        self._offsets.clear()
+        self._map()
+
+    def _map(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self.size:
+            self._mm = mmap.mmap(self._file.fileno(), self.size, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """
+        Releases the mapping (on Windows a mapped file can't be deleted).
+        """
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def at_start(self):
+        return self.origin == 0
+
+    # ---------------------------------
+    # Indexing
+    # ---------------------------------
+    def _count(self, start, end):
+        """Lines starting in [start, end); end is a line start or EOF."""
+        if end <= start:
+            return 0
+        count = self._mm[start:end].count(b"\n")
+        if self._mm[end - 1] != 0x0A:
+            count += 1  # unfinished last line
+        return count
+
+    def _rebuild_firsts(self):
+        self._firsts = []
+        row = 0
+        for _, _, count in self._blocks:
+            self._firsts.append(row)
+            row += count
+        self.lines = row
+
+    def scan_back(self):
+        """
+        The block just before the indexed region, or None at the start.
+
+        Returns:
+            (start, end, line count)
+        """
+        end = self.origin
+        if end == 0 or self._mm is None:
+            return None
+
+        low = max(0, end - BLOCK_SIZE)
+        start = 0
+        if low > 0:
+            newline = self._mm.find(b"\n", low, end)
+            if newline != -1 and newline + 1 < end:
+                start = newline + 1
+            else:
+                # One line longer than a block: take it whole
+                start = self._mm.rfind(b"\n", 0, low) + 1
+
+        return (start, end, self._count(start, end))
+
+    def add_front(self, block):
+        self._blocks.insert(0, block)
+        self.origin = block[0]
+        self._rebuild_firsts()
+
+    def scan_growth(self):
+        """
+        Checks the file for appended data (follow mode).
+
+        Returns:
+            None if the file was replaced or truncated (call open() again),
+            [] if nothing changed, else the blocks that replace the last
+            indexed block, as (start, end, line count)
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return []
+
+        if (st.st_dev, st.st_ino) != self._identity or st.st_size < self.size:
+            return None
+        if st.st_size == self.size:
+            return []
+
+        self.size = st.st_size
+        self._map()
+
+        # The last block may end with an unfinished line: index again from its start
+        pos = self._blocks[-1][0] if self._blocks else self.origin
+        blocks = []
+        while pos < self.size:
+            end = min(self.size, pos + BLOCK_SIZE)
+            if end < self.size:
+                newline = self._mm.rfind(b"\n", pos, end)
+                if newline == -1:
+                    newline = self._mm.find(b"\n", end)
+                end = newline + 1 if newline != -1 else self.size
+            blocks.append((pos, end, self._count(pos, end)))
+            pos = end
+        return blocks
+
+    def rows_added(self, blocks):
+        """Rows apply_growth(blocks) will add."""
+        if not blocks:
+            return 0
+        replaced = 0
+        if self._blocks and self._blocks[-1][0] == blocks[0][0]:
+            replaced = self._blocks[-1][2]
+        return sum(count for _, _, count in blocks) - replaced
+
+    def apply_growth(self, blocks):
+        if not blocks:
+            return
+        if self._blocks and self._blocks[-1][0] == blocks[0][0]:
+            self._offsets.pop(self._blocks.pop(), None)
+        elif not self._blocks:
+            self.origin = blocks[0][0]
+        self._blocks.extend(blocks)
+        self._rebuild_firsts()
+
+    # ---------------------------------
+    # Reading
+    # ---------------------------------
+    def _block_offsets(self, block):
+        offsets = self._offsets.get(block)
+        if offsets is not None:
+            self._offsets.move_to_end(block)
+            return offsets
+
+        start, end, _ = block
+        mm = self._mm
+        offsets = [start]
+        pos = start
+        while True:
+            newline = mm.find(b"\n", pos, end)
+            if newline == -1 or newline + 1 >= end:
+                break
+            pos = newline + 1
+            offsets.append(pos)
+
+        self._offsets[block] = offsets
+        if len(self._offsets) > OFFSET_CACHE_BLOCKS:
+            self._offsets.popitem(last=False)
+        return offsets
+
+    def line(self, row):
+        """Text of one indexed line (row 0 = first line at origin)."""
+        if row < 0 or row >= self.lines:
+            return ""
+
+        i = bisect.bisect_right(self._firsts, row) - 1
+        block = self._blocks[i]
+        offsets = self._block_offsets(block)
+        k = row - self._firsts[i]
+        start = offsets[k]
+        end = offsets[k + 1] if k + 1 < len(offsets) else block[1]
+
+        raw = self._mm[start:min(end, start + MAX_LINE_CHARS)]
+        return raw.decode("utf-8", "replace").rstrip("\r\n")
+
+    def last_line_open(self):
+        """True if the last indexed line has no newline yet (still being written)."""
+        return bool(self._blocks) and self._mm is not None and self._mm[self.size - 1] != 0x0A
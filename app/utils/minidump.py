@@ -0,0 +1,305 @@
+import bisect
+import mmap
+import ntpath
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.paths import app_data_dir
+from app.utils.log_analysis import LogCache
+from app.utils.walk import list_files
+
+
+CRASHES_DIR = r"%localappdata%\FiveM\FiveM.app\crashes"
+
+# Parsed dumps, reused while (size, mtime) match
+DUMP_CACHE_FILE = "crash_dumps.json"
+
+DUMP_WORKERS = 8
+
+# Crashes in one module from this many dumps is worth flagging
+REPEAT_CRASHES = 3
+
+# Stack scan of the crashing thread: bytes looked at above the stack
+# pointer and return-address candidates kept
+STACK_SCAN = 16 * 1024
+STACK_FRAMES = 8
+
+
+# -------------------------------
+#  MINIDUMP LAYOUT (minidumpapiset.h)
+# -------------------------------
+MDMP_SIGNATURE = b"MDMP"
+
+HEADER = struct.Struct("<4sIIIIIQ")          # signature, version, streams, dir rva, checksum, time, flags
+DIRECTORY = struct.Struct("<III")            # stream type, data size, rva
+EXCEPTION = struct.Struct("<IIIIQQ")         # thread id, align, code, flags, record, address
+MODULE = struct.Struct("<QIIII")             # base, size, checksum, time, name rva
+MODULE_SIZE = 108                            # sizeof(MINIDUMP_MODULE)
+THREAD = struct.Struct("<IIIIQQIIII")        # id, suspend, class, priority, teb, stack start, stack size, stack rva, context size, context rva
+LOCATION = struct.Struct("<II")              # data size, rva
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+
+EXCEPTION_CONTEXT = 160                      # offset of the thread context in the exception stream
+CONTEXT_RSP = 0x98                           # x64 CONTEXT
+CONTEXT_SIZE = 0x4D0
+
+THREAD_LIST_STREAM = 3
+MODULE_LIST_STREAM = 4
+EXCEPTION_STREAM = 6
+
+# The usual suspects; anything else is shown as hex
+EXCEPTION_NAMES = {
+    0xC0000005: "ACCESS_VIOLATION",
+    0xC0000409: "STACK_BUFFER_OVERRUN",
+    0xC0000374: "HEAP_CORRUPTION",
+    0xC00000FD: "STACK_OVERFLOW",
+    0xC0000017: "NO_MEMORY",
+    0xC000001D: "ILLEGAL_INSTRUCTION",
+    0xC0000094: "INTEGER_DIVIDE_BY_ZERO",
+    0xC0000602: "FAIL_FAST",
+    0xC06D007E: "MODULE_NOT_FOUND",
+    0x80000003: "BREAKPOINT",
+    0xE06D7363: "CPP_EXCEPTION",
+}
+
+
+def exception_name(code):
+    return EXCEPTION_NAMES.get(code, f"0x{code:08X}")
+
+
+def _unpack(layout, mm, offset):
+    if offset < 0 or offset + layout.size > len(mm):
+        raise ValueError("truncated dump")
+    return layout.unpack_from(mm, offset)
+
+
+def _read_string(mm, rva):
+    """MINIDUMP_STRING: byte length, then UTF-16LE text."""
+    (length,) = _unpack(U32, mm, rva)
+    if rva + 4 + length > len(mm):
+        raise ValueError("truncated dump")
+    return mm[rva + 4:rva + 4 + length].decode("utf-16-le", "replace")
+
+
+# -------------------------------
+#  SINGLE DUMP
+# -------------------------------
+def _empty_entry(size, mtime_ns, error=None):
+    return {
+        "size": size, "mtime_ns": mtime_ns, "ok": False, "error": error,
+        "timestamp": None, "code": None, "code_name": None, "address": None,
+        "module": None, "module_offset": None, "thread": None, "stack": None,
+    }
+
+
+def parse_dump(path, stack=False):
+    """
+    Reads the crash facts from one minidump. The file is memory-mapped
+    and only the header, stream directory, exception stream and module
+    list are touched, so a 500 MB full dump costs a few pages.
+
+    With stack=True the crashing thread's stack is scanned as well (one
+    more page or four).
+
+    Returns:
+        { 'size', 'mtime_ns', 'ok', 'error', 'timestamp', 'code',
+          'code_name', 'address', 'module', 'module_offset', 'thread',
+          'stack': [(module, offset)] or None }
+        'module' is the file name of the module containing the
+        exception address, or None if it wasn't in any loaded module.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        entry = _empty_entry(st.st_size, st.st_mtime_ns)
+        if st.st_size < HEADER.size:
+            entry["error"] = "too small"
+            return entry
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                _parse(mm, entry, stack)
+            except ValueError as e:
+                entry["error"] = str(e)
+    return entry
+
+
+def _parse(mm, entry, stack=False):
+    signature, _, streams, dir_rva, _, timestamp, _ = _unpack(HEADER, mm, 0)
+    if signature != MDMP_SIGNATURE:
+        raise ValueError("not a minidump")
+    entry["timestamp"] = timestamp
+
+    locations = {}
+    for i in range(streams):
+        stream_type, data_size, rva = _unpack(DIRECTORY, mm, dir_rva + i * DIRECTORY.size)
+        locations.setdefault(stream_type, (rva, data_size))
+
+    if EXCEPTION_STREAM not in locations:
+        raise ValueError("no exception stream")
+
+    exception_rva, _ = locations[EXCEPTION_STREAM]
+    thread, _, code, _, _, address = _unpack(EXCEPTION, mm, exception_rva)
+    entry.update(thread=thread, code=code, code_name=exception_name(code), address=address)
+
+    modules = _modules(mm, locations)
+    found = _find_module(modules, address)
+    if found:
+        entry["module"], entry["module_offset"] = _module_name(mm, found), address - found[0]
+
+    if stack:
+        entry["stack"] = _scan_stack(mm, locations, exception_rva, thread, modules)
+
+    entry["ok"] = True
+
+
+def _modules(mm, locations):
+    """Loaded modules as (base, size, name rva), sorted by base."""
+    if MODULE_LIST_STREAM not in locations:
+        return []
+    rva, _ = locations[MODULE_LIST_STREAM]
+    (count,) = _unpack(U32, mm, rva)
+    modules = []
+    for i in range(min(count, (len(mm) - rva - 4) // MODULE_SIZE)):
+        base, size, _, _, name_rva = _unpack(MODULE, mm, rva + 4 + i * MODULE_SIZE)
+        modules.append((base, size, name_rva))
+    modules.sort()
+    return modules
+
+
+def _find_module(modules, address):
+    i = bisect.bisect_right(modules, (address, float("inf"))) - 1
+    if i >= 0 and address < modules[i][0] + modules[i][1]:
+        return modules[i]
+    return None
+
+
+def _module_name(mm, module):
+    return ntpath.basename(_read_string(mm, module[2]))
+
+
+def _scan_stack(mm, locations, exception_rva, thread, modules):
+    """
+    Return-address candidates on the crashing thread's stack: every
+    aligned value above the stack pointer that points into a loaded
+    module, as (module, offset), nearest the top first. No unwinding
+    (that needs the PE unwind tables), but the same bug leaves the
+    same values behind, which is what grouping crashes needs.
+    """
+    if THREAD_LIST_STREAM not in locations or not modules:
+        return []
+
+    context_size, context_rva = _unpack(LOCATION, mm, exception_rva + EXCEPTION_CONTEXT)
+    if context_size < CONTEXT_SIZE:
+        return []  # not an x64 context
+    (sp,) = _unpack(U64, mm, context_rva + CONTEXT_RSP)
+
+    rva, _ = locations[THREAD_LIST_STREAM]
+    (count,) = _unpack(U32, mm, rva)
+    for i in range(min(count, (len(mm) - rva - 4) // THREAD.size)):
+        fields = _unpack(THREAD, mm, rva + 4 + i * THREAD.size)
+        if fields[0] == thread:
+            start, size, data_rva = fields[5:8]
+            break
+    else:
+        return []
+
+    if not start <= sp < start + size:
+        return []
+    begin = data_rva + (sp - start)
+    end = min(data_rva + size, begin + STACK_SCAN, len(mm))
+    end -= (end - begin) % U64.size
+
+    names = {}
+    frames = []
+    for (value,) in U64.iter_unpack(mm[begin:end]):
+        module = _find_module(modules, value)
+        if module is None:
+            continue
+        if module not in names:
+            names[module] = _module_name(mm, module)
+        frames.append((names[module], value - module[0]))
+        if len(frames) >= STACK_FRAMES:
+            break
+    return frames
+
+
+# -------------------------------
+#  FOLDER ANALYSIS
+# -------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dump_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LogCache(os.path.join(app_data_dir(), DUMP_CACHE_FILE))
+        return _cache
+
+
+def find_dumps(folder):
+    """All .dmp files under folder (FiveM nests some per crash): [(path, stat)]."""
+    return list_files(folder, ".dmp")
+
+
+def _parse_cached(path, st, cache):
+    entry = cache.get(path, st.st_size, st.st_mtime_ns)
+    if entry is not None:
+        return entry, False
+    try:
+        entry = parse_dump(path)
+    except (OSError, ValueError) as e:
+        return _empty_entry(st.st_size, st.st_mtime_ns, str(e)), False
+    cache.put(path, entry)
+    return entry, True
+
+
+def analyze_crashes(folder=None, workers=DUMP_WORKERS, cache=None):
+    """
+    Parses every crash dump under the FiveM crashes folder (in parallel,
+    cached per file) and ranks the modules the crashes happened in.
+
+    Returns:
+        { 'dumps', 'parsed': dumps read this time, 'unreadable',
+          'modules': [(module, crashes, last timestamp)]   (most crashes first),
+          'codes': [(exception name, crashes)],
+          'crashes': { path: entry (see parse_dump) } }
+    """
+    folder = folder or os.path.expandvars(CRASHES_DIR)
+    cache = cache or get_dump_cache()
+    dumps = find_dumps(folder)
+
+    summary = {"dumps": len(dumps), "parsed": 0, "unreadable": 0,
+               "modules": [], "codes": [], "crashes": {}}
+    if not dumps:
+        return summary
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(dumps)))) as pool:
+        parsed = list(pool.map(lambda d: _parse_cached(d[0], d[1], cache), dumps))
+
+    modules, codes = {}, {}
+    for (path, _), (entry, fresh) in zip(dumps, parsed):
+        summary["crashes"][path] = entry
+        summary["parsed"] += fresh
+        if not entry["ok"]:
+            summary["unreadable"] += 1
+            continue
+
+        name = entry["module"] or "unknown module"
+        count, last = modules.get(name, (0, 0))
+        modules[name] = (count + 1, max(last, entry["timestamp"] or 0))
+        codes[entry["code_name"]] = codes.get(entry["code_name"], 0) + 1
+
+    cache.save(folder, [path for path, _ in dumps])
+
+    summary["modules"] = sorted(
+        ((name, count, last) for name, (count, last) in modules.items()),
+        key=lambda m: (m[1], m[2]), reverse=True,
+    )
+    summary["codes"] = sorted(codes.items(), key=lambda c: c[1], reverse=True)
+    return summary
@@ -11,3 +11,14 @@ def resource_path(relative_path: str) -> str:
         base_path = os.path.abspath(".")
 
     return os.path.join(base_path, relative_path)
+
+
+def app_data_dir() -> str:
+    """
+    Returns (and creates) the per-user folder for the app's own files
+    (scan index, journals, archives). Lives under %LOCALAPPDATA% on Windows.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    path = os.path.join(base, "LURP-CacheClear")
+    os.makedirs(path, exist_ok=True)
+    return path
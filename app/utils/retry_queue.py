@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+
+from app.utils.paths import app_data_dir
+from app.utils.deleter import _unlink, classify_error
+
+
+# Total seconds a clean may spend retrying locked files
+RETRY_BUDGET = 10.0
+
+# Backoff between retry rounds: 0.25s, 0.5s, 1s, 2s, 4s, 4s...
+RETRY_FIRST_DELAY = 0.25
+RETRY_MAX_DELAY = 4.0
+
+# Files still locked after a clean, deleted on the next app start
+PENDING_FILE = "pending_deletes.json"
+
+_pending_lock = threading.Lock()
+
+
+# -------------------------------
+#  RETRY QUEUE
+# -------------------------------
+def retry_locked(paths, budget=RETRY_BUDGET, token=None):
+    """
+    Retries deleting files that were locked, in rounds with exponential
+    backoff, until they are all gone or the time budget runs out.
+
+    Files that vanish meanwhile or fail for another reason (e.g.
+    permission) leave the queue straight away, listed in 'gave_up'.
+
+    Returns:
+        { 'files', 'bytes', 'deleted': [(path, size)], 'still_locked': [paths],
+          'gave_up': [(path, category)] }
+    """
+    summary = {"files": 0, "bytes": 0, "deleted": [], "still_locked": [], "gave_up": []}
+    queue = list(dict.fromkeys(paths))
+    deadline = time.monotonic() + budget
+    delay = RETRY_FIRST_DELAY
+
+    while queue:
+        if token and token.cancelled:
+            break
+
+        wait = min(delay, deadline - time.monotonic())
+        if wait <= 0:
+            break
+        time.sleep(wait)
+        delay = min(delay * 2, RETRY_MAX_DELAY)
+
+        locked = []
+        for path in queue:
+            try:
+                size = os.lstat(path).st_size
+                _unlink(path)
+            except OSError as e:
+                category = classify_error(e)
+                if category == "locked":
+                    locked.append(path)
+                else:
+                    summary["gave_up"].append((path, category))
+                continue
+
+            summary["files"] += 1
+            summary["bytes"] += size
+            summary["deleted"].append((path, size))
+
+        queue = locked
+
+    summary["still_locked"] = queue
+    return summary
+
+
+def retry_failures(results, budget=RETRY_BUDGET, token=None, schedule=True):
+    """
+    Retries the 'locked' failures of one or more delete results and
+    folds the outcome back into them (bytes/files up, failure counts
+    and lists updated). Files still locked at the end are scheduled
+    for the next run unless schedule=False.
+
+    Returns:
+        retry summary (see retry_locked)
+    """
+    owner = {}
+    for result in results:
+        for path, category in result["failures"]:
+            if category == "locked":
+                owner[path] = result
+
+    summary = retry_locked(list(owner), budget, token) if owner else {
+        "files": 0, "bytes": 0, "deleted": [], "still_locked": [], "gave_up": []
+    }
+
+    outcome = {path: category for path, category in summary["gave_up"]}
+    for path, size in summary["deleted"]:
+        result = owner[path]
+        result["files"] += 1
+        result["bytes"] += size
+        outcome[path] = None
+
+    for path, category in summary["gave_up"]:
+        owner[path]["failed"][category] += 1
+    for path in outcome:
+        owner[path]["failed"]["locked"] -= 1
+
+    # Deleted (None) and vanished files are no longer failures
+    for result in results:
+        result["failures"] = [
+            (p, outcome.get(p, c)) for p, c in result["failures"]
+            if outcome.get(p, c) not in (None, "vanished")
+        ]
+
+    if schedule and summary["still_locked"]:
+        schedule_next_run(summary["still_locked"])
+
+    return summary
+
+
+# -------------------------------
+#  NEXT-RUN DELETES
+# -------------------------------
+def _pending_path():
+    return os.path.join(app_data_dir(), PENDING_FILE)
+
+
+def _identity(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def load_pending():
+    """
+    Returns:
+        [[path, size, mtime_ns, inode]]
+        (entries from older versions, bare paths, are dropped: they
+        can't be told apart from a new file of the same name)
+    """
+    try:
+        with open(_pending_path(), "r", encoding="utf-8") as f:
+            return [e for e in json.load(f) if isinstance(e, list) and len(e) == 4]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def _save_pending(entries):
+    try:
+        with open(_pending_path(), "w", encoding="utf-8") as f:
+            json.dump(sorted({e[0]: e for e in entries}.values()), f, indent=2)
+    except OSError as e:
+        print(f"Failed to save pending deletes: {e}")
+
+
+def schedule_next_run(paths):
+    """
+    Remembers files to delete on the next app start (before the game
+    has them open again), with their size, mtime and inode, so only
+    the same file is deleted and not a new one created in its place.
+    """
+    entries = []
+    for path in paths:
+        try:
+            entries.append([path] + _identity(os.lstat(path)))
+        except OSError:
+            continue
+
+    with _pending_lock:
+        _save_pending(load_pending() + entries)
+
+
+def run_pending():
+    """
+    Deletes files scheduled by an earlier clean. Files that are still
+    locked stay scheduled; missing ones, and ones that are no longer
+    the same file (recreated by the game), are dropped.
+
+    Returns:
+        { 'files', 'bytes', 'still_locked', 'replaced' }
+    """
+    with _pending_lock:
+        entries = load_pending()
+        summary = {"files": 0, "bytes": 0, "still_locked": [], "replaced": 0}
+        if not entries:
+            return summary
+
+        locked = []
+        for entry in entries:
+            path = entry[0]
+            try:
+                st = os.lstat(path)
+                if _identity(st) != entry[1:]:
+                    summary["replaced"] += 1
+                    continue
+                _unlink(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                if classify_error(e) == "locked":
+                    summary["still_locked"].append(path)
+                    locked.append(entry)
+                continue
+            summary["files"] += 1
+            summary["bytes"] += st.st_size
+
+        _save_pending(locked)
+
+    if summary["files"]:
+        print(f"Deleted {summary['files']} files left locked by an earlier clean.")
+    return summary
@@ -0,0 +1,344 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.utils.paths import app_data_dir
+from app.utils.scanner import (
+    new_result, scan_tree, _scan_dir, _scan_tree_parallel, TopN, largest_dirs, SCAN_WORKERS
+)
+
+
+INDEX_FILE = "scan_index.db"
+
+# Directories modified this recently are not trusted on the next run
+# (mtime resolution is coarse on some filesystems, e.g. 2s on FAT)
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+# A file that grows in place doesn't touch its directory's mtime, so
+# rows are listed again once they are this old...
+ROW_TTL_NS = 24 * 3600 * 1_000_000_000
+
+# ...and folders known to hold files that grow in place are listed
+# on every scan (they are small)
+GROWS_IN_PLACE = {"logs"}
+
+
+class ScanIndex:
+    """
+    Persistent per-directory size index (SQLite, under the user profile).
+
+    One row per directory:
+        path, mtime_ns, own bytes/files/errors, sub-directory names,
+        own largest files ([[bytes, name]], see TopN), when it was written
+
+    "own" means the files directly inside that directory, so a row
+    goes stale when its directory mtime changes (a file is created,
+    deleted or renamed in it), or when it is older than ROW_TTL_NS
+    (files grown in place).
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(app_data_dir(), INDEX_FILE)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                " path TEXT PRIMARY KEY,"
+                " mtime_ns INTEGER,"
+                " bytes INTEGER,"
+                " files INTEGER,"
+                " errors INTEGER,"
+                " children TEXT,"
+                " top TEXT)"
+            )
+
+            # Indexes written before 'top' existed: add the column and
+            # force every directory to be listed once more to fill it
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(dirs)")]
+            if "top" not in columns:
+                self.conn.execute("ALTER TABLE dirs ADD COLUMN top TEXT DEFAULT '[]'")
+                self.conn.execute("UPDATE dirs SET mtime_ns = -1")
+            if "scanned_ns" not in columns:
+                # Older rows count as expired
+                self.conn.execute("ALTER TABLE dirs ADD COLUMN scanned_ns INTEGER DEFAULT 0")
+
+    def load(self, root, fresh_after=None):
+        """
+        Returns { path: (mtime_ns, bytes, files, errors, children, top) } for
+        root and everything below it.
+
+        fresh_after (optional, ns): rows written before then come back
+        with mtime_ns = -1, so they are not trusted.
+        """
+        prefix = root.rstrip("\\/") + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, CASE WHEN scanned_ns >= ? THEN mtime_ns ELSE -1 END,"
+                " bytes, files, errors, children, top FROM dirs"
+                " WHERE path = ? OR (path >= ? AND path < ?)",
+                (fresh_after or 0, root, prefix, upper),
+            ).fetchall()
+
+        return {row[0]: row[1:] for row in rows}
+
+    def load_row(self, path):
+        """
+        Returns (mtime_ns, bytes, files, errors, children, top) for one directory, or None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT mtime_ns, bytes, files, errors, children, top FROM dirs WHERE path = ?",
+                (path,),
+            ).fetchone()
+        return row
+
+    def delete_subtree(self, root):
+        """
+        Drops root and every row below it.
+        """
+        prefix = root.rstrip("\\/") + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, prefix, upper),
+            )
+
+    def save(self, updates, stale):
+        """
+        Writes changed rows and drops rows for directories that are gone,
+        all in one transaction.
+        """
+        if not updates and not stale:
+            return
+
+        now_ns = time.time_ns()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dirs"
+                " (path, mtime_ns, bytes, files, errors, children, top, scanned_ns)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (tuple(row) + (now_ns,) for row in updates),
+            )
+            self.conn.executemany("DELETE FROM dirs WHERE path = ?", ((p,) for p in stale))
+
+
+# -------------------------------
+#  Shared index
+# -------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Returns the shared ScanIndex, or None if it can't be opened
+    (read-only profile, corrupt file...). Scans then fall back to full walks.
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = ScanIndex()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Scan index unavailable: {e}")
+                _index = False
+        return _index or None
+
+
+# -------------------------------
+#  Largest files per directory
+# -------------------------------
+def dump_top(top):
+    """
+    JSON for the 'top' column: [[bytes, file name], ...].
+    """
+    return json.dumps([[size, os.path.basename(p)] for size, p in top.items()])
+
+
+def largest_from_index(root, index=None):
+    """
+    Builds 'top_files' / 'top_dirs' for root from the index alone
+    (used when totals were patched without a scan, e.g. by the watcher).
+
+    Returns:
+        (top_files, top_dirs)
+    """
+    index = index or get_index()
+    if index is None:
+        return [], []
+
+    top = TopN()
+    own_sizes = {}
+    for path, row in index.load(root).items():
+        own_sizes[path] = row[1]
+        for size, name in json.loads(row[5] or "[]"):
+            top.push(size, os.path.join(path, name))
+
+    return top.items(), largest_dirs(root, own_sizes)
+
+
+# -------------------------------
+#  INCREMENTAL SCAN
+# -------------------------------
+def scan_tree_indexed(path, index=None, full=False, progress=None, token=None, limiter=None):
+    """
+    Same totals as scan_tree, but answered from the index where possible.
+
+    Every directory is still stat'ed (cheap), but only directories whose
+    mtime changed since the last scan are listed again. Unchanged
+    subtrees cost one stat per directory instead of one per file.
+
+    A file that grows in place does not touch its directory's mtime:
+    GROWS_IN_PLACE folders are always listed and rows older than
+    ROW_TTL_NS are not trusted.
+
+    With no trusted rows for path (first scan, all expired) or with
+    full=True, the tree is walked by the parallel scanner instead
+    (see _scan_tree_parallel) and the index rebuilt from it, dropping
+    rows of directories that are gone.
+
+    progress (optional) is a ProgressThrottle; its expected_files is
+    filled from the previous scan stored in the index.
+    token (optional) is a CancelToken. A stopped scan returns its totals
+    so far with 'partial' = True; directories it finished listing are
+    still saved to the index, so the next scan picks up from there.
+    limiter (optional) is an IOLimiter for user-started scans (see
+    scan_tree).
+
+    'top_files' / 'top_dirs' are built in the same pass; reused
+    directories contribute their stored largest files.
+
+    Returns:
+        scan result dict, plus 'reused' = directories answered from the index
+    """
+    index = index or get_index()
+    if index is None:
+        return scan_tree(path, progress=progress, token=token, limiter=limiter)
+
+    now_ns = time.time_ns()
+    previous = index.load(path, fresh_after=now_ns - ROW_TTL_NS)
+    if progress:
+        progress.expected_files = sum(row[2] for row in previous.values())
+
+    if full or not any(row[0] >= 0 for row in previous.values()):
+        return _rebuild(path, index, previous, progress, token, limiter)
+    known = previous
+
+    result = new_result(path)
+    result["reused"] = 0
+    top = TopN()
+    own_sizes = {}
+
+    report = None
+    if progress:
+        report = lambda: progress.poll(lambda: (result["files"], result["bytes"]))
+
+    updates = []
+    seen = set()
+    stack = [path]
+
+    while stack:
+        if token and token.cancelled:
+            result["partial"] = True
+            break
+
+        current = stack.pop()
+
+        try:
+            mtime_ns = os.stat(current).st_mtime_ns
+        except OSError:
+            result["errors"] += 1
+            continue
+
+        seen.add(current)
+        row = known.get(current)
+
+        if row and row[0] == mtime_ns and os.path.basename(current).lower() not in GROWS_IN_PLACE:
+            _, size, files, errors, children, own_top = row
+            names = json.loads(children)
+            for file_size, name in json.loads(own_top or "[]"):
+                top.push(file_size, os.path.join(current, name))
+            result["reused"] += 1
+        else:
+            own = new_result(current)
+            own_top = TopN()
+            subdirs = []
+            if not _scan_dir(current, own, subdirs, token=token, top=own_top, limiter=limiter):
+                result["partial"] = True
+                break
+
+            size, files, errors = own["bytes"], own["files"], own["errors"]
+            names = [os.path.basename(d) for d in subdirs]
+            top.update(own_top)
+
+            trusted = mtime_ns if now_ns - mtime_ns > RACY_WINDOW_NS else -1
+            updates.append((current, trusted, size, files, errors,
+                            json.dumps(names), dump_top(own_top)))
+
+        own_sizes[current] = size
+
+        result["bytes"] += size
+        result["files"] += files
+        result["errors"] += errors
+        result["dirs"] += len(names)
+
+        stack.extend(os.path.join(current, n) for n in names)
+
+        if report:
+            report()
+
+    result["top_files"] = top.items()
+    result["top_dirs"] = largest_dirs(path, own_sizes)
+
+    # Unvisited rows are only known to be gone after a complete walk
+    stale = [] if result["partial"] else [p for p in previous if p not in seen]
+
+    try:
+        index.save(updates, stale)
+    except sqlite3.Error as e:
+        print(f"Failed to update scan index: {e}")
+
+    if progress:
+        progress.finish(result)
+
+    return result
+
+
+def _rebuild(path, index, previous, progress=None, token=None, limiter=None):
+    """
+    Cold / full pass of scan_tree_indexed: a parallel walk that also
+    writes every directory it listed to the index.
+    """
+    rows = []
+    result = _scan_tree_parallel(path, SCAN_WORKERS, progress, token, rows, limiter)
+    result["reused"] = 0
+
+    now_ns = time.time_ns()
+    updates = []
+    listed = set()
+    for current, mtime_ns, size, files, errors, names, own_top in rows:
+        listed.add(current)
+        trusted = mtime_ns if mtime_ns >= 0 and now_ns - mtime_ns > RACY_WINDOW_NS else -1
+        updates.append((current, trusted, size, files, errors,
+                        json.dumps(names), dump_top(own_top)))
+
+    stale = [] if result["partial"] else [p for p in previous if p not in listed]
+
+    try:
+        index.save(updates, stale)
+    except sqlite3.Error as e:
+        print(f"Failed to update scan index: {e}")
+
+    if progress:
+        progress.finish(result)
+
+    return result
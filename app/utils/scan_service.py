@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.utils.cancel import CancelToken
+from app.utils.scanner import new_result, ProgressThrottle
+from app.utils.scan_index import scan_tree_indexed
+from app.utils.throttle import current_limiter
+
+
+# Cleanable targets shown across the app (label -> unexpanded path)
+TARGETS = {
+    "FiveM Cache": r"%localappdata%\FiveM\FiveM.app\data\cache",
+    "FiveM Logs": r"%localappdata%\FiveM\FiveM.app\logs",
+    "Shader Cache": r"%localappdata%\Rockstar Games\GTA V\Shaders",
+    "Windows Temp": r"%temp%",
+}
+
+# Seconds a finished scan is reused before a new walk is started
+SCAN_TTL = 60.0
+
+
+class ScanService:
+    """
+    One in-process owner for folder scans.
+
+    - Keeps the target list
+    - Only one scan per root runs at a time; callers asking for the
+      same root while it runs share the same Future
+    - Results younger than `ttl` seconds are reused
+    - Every finished result is pushed to subscribers as callback(path, result)
+    - Running scans stream throttled progress events (see ProgressThrottle)
+      to progress subscribers as callback(event)
+    - Every running scan has a CancelToken; cancel_all() stops them and
+      a deadline gives "best answer within N seconds" results. Partial
+      results are published (flagged 'partial') but never cached.
+    - Only scans the user asked for (throttled=True) follow the I/O
+      throttle; startup and watcher rescans run at full speed.
+
+    Callbacks run on a worker thread. Qt pages should forward them
+    through a signal before touching widgets.
+    """
+
+    def __init__(self, targets=None, ttl=SCAN_TTL, max_workers=4):
+        self.targets = dict(targets or TARGETS)
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._cache = {}        # path -> (finished_at, result)
+        self._inflight = {}     # path -> Future
+        self._tokens = {}       # path -> CancelToken of the running scan
+        self._subscribers = []
+        self._progress_subscribers = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+
+    # ---------------------------------
+    # Subscribers
+    # ---------------------------------
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def subscribe_progress(self, callback):
+        with self._lock:
+            self._progress_subscribers.append(callback)
+
+    def unsubscribe_progress(self, callback):
+        with self._lock:
+            if callback in self._progress_subscribers:
+                self._progress_subscribers.remove(callback)
+
+    def _notify_progress(self, event):
+        with self._lock:
+            subscribers = list(self._progress_subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Progress subscriber failed: {e}")
+
+    def publish(self, path, result):
+        """
+        Stores a result and hands it to every subscriber. Also used by
+        code that already knows the new size (e.g. right after a clean).
+        """
+        with self._lock:
+            self._cache[path] = (time.monotonic(), result)
+        self._notify(path, result)
+
+    def _notify(self, path, result):
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(path, result)
+            except Exception as e:
+                print(f"Scan subscriber failed: {e}")
+
+    # ---------------------------------
+    # Scans
+    # ---------------------------------
+    def path_for(self, label):
+        return os.path.expandvars(self.targets[label])
+
+    def cached(self, path, max_age=None):
+        """
+        Returns the cached result for path if it is fresh enough, else None.
+        """
+        max_age = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            entry = self._cache.get(path)
+
+        if entry and time.monotonic() - entry[0] <= max_age:
+            return entry[1]
+        return None
+
+    def scan(self, path, max_age=None, deadline=None, throttled=False):
+        """
+        Returns a Future for the scan result of path.
+
+        Reuses a fresh cached result, or joins a scan of the same root
+        that is already running, before starting a new one.
+
+        deadline: seconds the new scan may run before it stops and
+        returns a partial result (ignored when joining a running scan).
+        throttled: user-started scan, runs under the current I/O limiter
+        (also ignored when joining a running scan).
+        """
+        fresh = self.cached(path, max_age)
+        if fresh is not None:
+            fut = Future()
+            fut.set_result(fresh)
+            return fut
+
+        with self._lock:
+            fut = self._inflight.get(path)
+            if fut is None:
+                token = CancelToken(timeout=deadline)
+                self._tokens[path] = token
+                fut = self._pool.submit(self._run_scan, path, token, throttled)
+                self._inflight[path] = fut
+            return fut
+
+    def _run_scan(self, path, token, throttled=False):
+        try:
+            if token.cancelled:
+                result = new_result(path)
+                result["partial"] = True
+            elif os.path.exists(path):
+                progress = ProgressThrottle(path, self._notify_progress)
+                limiter = current_limiter() if throttled else None
+                result = scan_tree_indexed(path, progress=progress, token=token, limiter=limiter)
+            else:
+                result = new_result(path)
+        except Exception:
+            with self._lock:
+                self._inflight.pop(path, None)
+                self._tokens.pop(path, None)
+            raise
+
+        # Cache before leaving the in-flight table so no caller can
+        # slip in between and start a duplicate walk
+        with self._lock:
+            if not result["partial"]:
+                self._cache[path] = (time.monotonic(), result)
+            self._inflight.pop(path, None)
+            self._tokens.pop(path, None)
+
+        self._notify(path, result)
+        return result
+
+    def scan_all(self, max_age=None, deadline=None, throttled=False):
+        """
+        Starts (or reuses) scans for every target.
+
+        Returns:
+            dict of label -> Future
+        """
+        return {
+            label: self.scan(self.path_for(label), max_age, deadline, throttled)
+            for label in self.targets
+        }
+
+    def results(self, max_age=None, deadline=None):
+        """
+        Blocking helper: dict of label -> scan result for every target.
+        """
+        futures = self.scan_all(max_age, deadline)
+        return {label: fut.result() for label, fut in futures.items()}
+
+    def cancel_all(self):
+        """
+        Stops every running scan (e.g. when the app closes). Their
+        futures still resolve, with partial results.
+        """
+        with self._lock:
+            tokens = list(self._tokens.values())
+
+        for token in tokens:
+            token.cancel()
+
+    def invalidate(self, path=None):
+        """
+        Drops cached results (all of them when path is None).
+        """
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+
+# -------------------------------
+#  Shared service
+# -------------------------------
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_scan_service():
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            _service = ScanService()
+        return _service
@@ -0,0 +1,403 @@
+import heapq
+import os
+import threading
+import time
+from collections import deque
+
+from app.utils.walk import is_link
+
+
+# -------------------------------
+#  Helper: Empty scan result
+# -------------------------------
+def new_result(path):
+    """
+    Returns an empty scan result dict for a root path.
+    """
+    return {
+        "path": path,
+        "bytes": 0,
+        "files": 0,
+        "dirs": 0,
+        "errors": 0,
+        "partial": False,  # True when a cancel/deadline stopped the walk early
+        "top_files": [],   # [(bytes, path)] largest files, biggest first
+        "top_dirs": [],    # [(bytes, path)] largest sub-directories (whole subtree)
+    }
+
+
+# -------------------------------
+#  Largest files / directories
+# -------------------------------
+# How many entries the top-N lists keep per scan
+TOP_N = 25
+
+
+class TopN:
+    """
+    Bounded min-heap keeping the n largest (size, path) pairs seen.
+
+    push() is O(log n) and only touches the heap when the entry beats
+    the current smallest one, so feeding every file of a scan is cheap.
+    """
+
+    def __init__(self, n=TOP_N):
+        self.n = n
+        self._heap = []
+
+    def push(self, size, path):
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, (size, path))
+        elif (size, path) > self._heap[0]:
+            # Ties are broken on path, so the result doesn't depend on walk order
+            heapq.heapreplace(self._heap, (size, path))
+
+    def update(self, other):
+        for size, path in other._heap:
+            self.push(size, path)
+
+    def items(self):
+        return sorted(self._heap, reverse=True)
+
+
+def largest_dirs(root, own_sizes, n=TOP_N):
+    """
+    Rolls per-directory own sizes ({ dir: bytes of files directly in it })
+    up into subtree totals and returns the n largest sub-directories of
+    root as [(bytes, path)], biggest first. No filesystem access.
+    """
+    totals = dict(own_sizes)
+
+    # Children always have longer paths than their parents
+    for path in sorted(totals, key=len, reverse=True):
+        if path == root:
+            continue
+        parent = os.path.dirname(path)
+        if parent in totals:
+            totals[parent] += totals[path]
+
+    top = TopN(n)
+    for path, size in totals.items():
+        if path != root:
+            top.push(size, path)
+    return top.items()
+
+
+# -------------------------------
+#  Progress events
+# -------------------------------
+# Minimum seconds between two progress events of one scan (10/s)
+PROGRESS_INTERVAL = 0.1
+
+
+class ProgressThrottle:
+    """
+    Rate-limited progress stream for one scan.
+
+    The scan calls poll() as often as it likes; the callback gets at most
+    one event per `interval` seconds, plus a final one from finish().
+
+    Events are dicts:
+        { 'root', 'files', 'bytes', 'expected_files', 'done' }
+
+    expected_files is the file count from the previous scan when known
+    (0 otherwise), so UIs can turn it into a percentage.
+    """
+
+    def __init__(self, root, callback, interval=PROGRESS_INTERVAL, expected_files=0):
+        self.root = root
+        self.callback = callback
+        self.interval = interval
+        self.expected_files = expected_files
+
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self, totals):
+        """
+        totals: zero-arg callable returning (files, bytes); only called
+        when an event is actually due.
+        """
+        now = time.monotonic()
+        if now < self._next:
+            return
+
+        with self._lock:
+            if now < self._next:
+                return
+            self._next = now + self.interval
+
+        files, size = totals()
+        self._emit(files, size, False)
+
+    def finish(self, result):
+        self._emit(result["files"], result["bytes"], True)
+
+    def _emit(self, files, size, done):
+        try:
+            self.callback({
+                "root": self.root,
+                "files": files,
+                "bytes": size,
+                "expected_files": self.expected_files,
+                "done": done,
+            })
+        except Exception as e:
+            print(f"Progress callback failed: {e}")
+
+
+# -------------------------------
+#  SCAN ENGINE
+# -------------------------------
+# Default worker count for single-tree scans
+SCAN_WORKERS = 4
+
+# Progress is also reported inside very large flat folders every N entries
+_REPORT_EVERY = 2048
+
+
+def _scan_dir(current, result, children, report=None, token=None, top=None, mtimes=None,
+              limiter=None):
+    """
+    Lists one directory into result, appending sub-directories to children.
+    report (optional) is called every _REPORT_EVERY entries.
+    top (optional) is a TopN fed with every file.
+    mtimes (optional) is a dict that gets each sub-directory's mtime_ns,
+    from the listing itself (free on Windows).
+    Links (symlinks, junctions) count as files and are never entered,
+    like in the deleter (see walk.is_link).
+
+    limiter (optional) is the IOLimiter of a throttled scan (see
+    throttle.py): every entry counts as one operation, charged once per
+    _REPORT_EVERY entries and when the listing ends.
+
+    Returns False if the token stopped the listing half way, else True.
+    """
+    try:
+        it = os.scandir(current)
+    except OSError:
+        result["errors"] += 1
+        return True
+
+    seen = 0
+    with it:
+        for entry in it:
+            seen += 1
+            if seen % _REPORT_EVERY == 0:
+                if limiter:
+                    limiter.charge(_REPORT_EVERY)
+                if report:
+                    report()
+                if token and token.cancelled:
+                    return False
+            try:
+                if entry.is_dir(follow_symlinks=False) and not is_link(entry):
+                    if mtimes is not None:
+                        mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                    result["dirs"] += 1
+                    children.append(entry.path)
+                else:
+                    size = entry.stat(follow_symlinks=False).st_size
+                    result["bytes"] += size
+                    result["files"] += 1
+                    if top is not None:
+                        top.push(size, entry.path)
+            except OSError:
+                result["errors"] += 1
+
+    if limiter:
+        limiter.charge(1 + seen % _REPORT_EVERY)
+    return True
+
+
+def scan_tree(path, workers=1, progress=None, token=None, limiter=None):
+    """
+    Walks a folder with os.scandir and returns its totals.
+
+    Uses an explicit stack instead of recursion and reuses the
+    DirEntry stat data, so each entry costs a single stat at most
+    (none at all on Windows, where scandir already has it).
+
+    With workers > 1 the tree is split across threads, see
+    _scan_tree_parallel.
+
+    progress (optional) is a ProgressThrottle fed while walking.
+    token (optional) is a CancelToken; when it fires the walk stops and
+    the totals so far come back with 'partial' = True.
+    limiter (optional) is an IOLimiter, resolved once by the caller for
+    user-started scans (see current_limiter); background scans run
+    without one.
+
+    The largest files and sub-directories are collected in the same
+    pass ('top_files' / 'top_dirs', see TopN).
+
+    Returns:
+        { 'path', 'bytes', 'files', 'dirs', 'errors', 'partial',
+          'top_files', 'top_dirs' }
+    """
+    if workers > 1:
+        result = _scan_tree_parallel(path, workers, progress, token, limiter=limiter)
+    else:
+        result = new_result(path)
+        top = TopN()
+        own_sizes = {}
+        stack = [path]
+
+        report = None
+        if progress:
+            report = lambda: progress.poll(lambda: (result["files"], result["bytes"]))
+
+        while stack:
+            if token and token.cancelled:
+                result["partial"] = True
+                break
+            current = stack.pop()
+            before = result["bytes"]
+            if not _scan_dir(current, result, stack, report, token, top, limiter=limiter):
+                result["partial"] = True
+                break
+            own_sizes[current] = result["bytes"] - before
+            if report:
+                report()
+
+        result["top_files"] = top.items()
+        result["top_dirs"] = largest_dirs(path, own_sizes)
+
+    if progress:
+        progress.finish(result)
+
+    return result
+
+
+def _scan_tree_parallel(path, workers, progress=None, token=None, rows=None, limiter=None):
+    """
+    Work-stealing traversal of a single tree.
+
+    Every worker owns a deque of directories. It pops new work from
+    its own end (depth first, good locality) and, once that runs dry,
+    steals from the opposite end of another worker's deque, which tends
+    to hand out big untouched subtrees. Each worker keeps its own
+    counters and they are summed at the end, so totals are identical
+    to a single-threaded scan whatever order directories finish in.
+
+    rows (optional) is a list that gets one entry per directory listed
+    completely, for the scan index:
+        (path, mtime_ns, own bytes, own files, own errors, [sub-directory names], own TopN)
+    mtime_ns comes from the parent's listing (-1 if unknown).
+    """
+    mtimes = None
+    if rows is not None:
+        mtimes = {}
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+
+    queues = [deque() for _ in range(workers)]
+    queues[0].append(path)
+
+    # Directories queued or being listed; 0 means the walk is over
+    pending = [1]
+    stopped = [False]
+    cond = threading.Condition()
+
+    partials = [new_result(path) for _ in range(workers)]
+    tops = [TopN() for _ in range(workers)]
+    own_sizes = [{} for _ in range(workers)]
+
+    report = None
+    if progress:
+        def totals():
+            return (
+                sum(p["files"] for p in partials),
+                sum(p["bytes"] for p in partials),
+            )
+        report = lambda: progress.poll(totals)
+
+    def steal(index):
+        for offset in range(1, workers):
+            try:
+                return queues[(index + offset) % workers].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def worker(index):
+        own = queues[index]
+        result = partials[index]
+
+        while True:
+            if stopped[0] or (token and token.cancelled):
+                with cond:
+                    stopped[0] = True
+                    cond.notify_all()
+                return
+
+            try:
+                current = own.pop()
+            except IndexError:
+                current = steal(index)
+
+            if current is None:
+                with cond:
+                    if pending[0] == 0 or stopped[0]:
+                        return
+                    cond.wait(0.005)
+                continue
+
+            children = []
+            before = result["bytes"]
+            if rows is None:
+                if not _scan_dir(current, result, children, report, token, tops[index],
+                                 limiter=limiter):
+                    continue
+            else:
+                listing = new_result(current)
+                own_top = TopN()
+                if not _scan_dir(current, listing, children, report, token, own_top, mtimes,
+                                 limiter):
+                    continue
+                for key in ("bytes", "files", "dirs", "errors"):
+                    result[key] += listing[key]
+                tops[index].update(own_top)
+                rows.append((
+                    current, mtimes.get(current, -1),
+                    listing["bytes"], listing["files"], listing["errors"],
+                    [os.path.basename(c) for c in children], own_top,
+                ))
+            own_sizes[index][current] = result["bytes"] - before
+            if report:
+                report()
+
+            # Children are counted before they become stealable, so
+            # pending can never hit 0 while work is still out there
+            with cond:
+                pending[0] += len(children) - 1
+                own.extend(children)
+                if children or pending[0] == 0:
+                    cond.notify_all()
+
+    threads = [
+        threading.Thread(target=worker, args=(i,), daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    result = new_result(path)
+    for part in partials:
+        for key in ("bytes", "files", "dirs", "errors"):
+            result[key] += part[key]
+    result["partial"] = stopped[0]
+
+    top = TopN()
+    sizes = {}
+    for index in range(workers):
+        top.update(tops[index])
+        sizes.update(own_sizes[index])
+    result["top_files"] = top.items()
+    result["top_dirs"] = largest_dirs(path, sizes)
+
+    return result
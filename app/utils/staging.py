@@ -0,0 +1,220 @@
+import ctypes
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from app.utils.paths import app_data_dir
+from app.utils.deleter import delete_tree, describe_failures
+
+
+# Staging folder created next to each cleaned target (same volume, so
+# moving a target into it is a rename, not a copy)
+STAGING_NAME = ".lurp-staging"
+
+# Staging folders in use, so leftovers can be found on the next start
+REGISTRY_FILE = "staging.json"
+
+_registry_lock = threading.Lock()
+
+
+# -------------------------------
+#  Helper: Staging registry
+# -------------------------------
+def _registry_path():
+    return os.path.join(app_data_dir(), REGISTRY_FILE)
+
+
+def _load_registry():
+    try:
+        with open(_registry_path(), "r", encoding="utf-8") as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return set()
+
+
+def _save_registry(roots):
+    try:
+        with open(_registry_path(), "w", encoding="utf-8") as f:
+            json.dump(sorted(roots), f, indent=2)
+    except OSError as e:
+        print(f"Failed to save staging registry: {e}")
+
+
+def _register(staging_root):
+    with _registry_lock:
+        roots = _load_registry()
+        if staging_root not in roots:
+            roots.add(staging_root)
+            _save_registry(roots)
+
+
+# -------------------------------
+#  STAGE OUT
+# -------------------------------
+def stage_out(path):
+    """
+    Empties a folder instantly: renames it into a staging folder next to
+    it and recreates it empty. The old contents still need purging
+    (see Purger).
+
+    Returns:
+        the staged path, or None if the rename failed (e.g. a file
+        inside is open on Windows); the caller should delete in place.
+    """
+    path = path.rstrip("\\/")
+    if not os.path.isdir(path):
+        return None
+
+    staging_root = os.path.join(os.path.dirname(path), STAGING_NAME)
+    staged = os.path.join(staging_root, f"{os.path.basename(path)}.{time.time_ns()}")
+
+    try:
+        os.makedirs(staging_root, exist_ok=True)
+        _register(staging_root)
+        os.rename(path, staged)
+    except OSError as e:
+        print(f"Could not stage {path}: {e}")
+        return None
+
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        print(f"Could not recreate {path}: {e}")
+
+    return staged
+
+
+# -------------------------------
+#  BACKGROUND PURGE
+# -------------------------------
+# Windows: THREAD_MODE_BACKGROUND_BEGIN lowers CPU *and* I/O priority
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+
+def _lower_thread_priority():
+    """
+    Makes the calling thread low priority so purging doesn't slow the game.
+    """
+    try:
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), _THREAD_MODE_BACKGROUND_BEGIN)
+        elif hasattr(os, "setpriority"):
+            # On Linux a thread id works as a "process" here and only affects this thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (OSError, AttributeError) as e:
+        print(f"Could not lower purge priority: {e}")
+
+
+class Purger:
+    """
+    One low-priority daemon thread deleting staged folders in order.
+
+    submit(staged, on_done) queues a folder; on_done(result) gets the
+    delete result (called on the purge thread).
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, staged, on_done=None):
+        self._queue.put((staged, on_done))
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="purge", daemon=True)
+                self._thread.start()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        _lower_thread_priority()
+
+        while True:
+            staged, on_done = self._queue.get()
+            result = delete_tree(staged, workers=1, keep_root=False)
+
+            failures = describe_failures(result)
+            if failures:
+                print(f"Purge of {staged} left files behind: {failures}")
+
+            # Drop the staging folder once its last entry is gone
+            try:
+                os.rmdir(os.path.dirname(staged))
+            except OSError:
+                pass
+
+            if on_done:
+                try:
+                    on_done(result)
+                except Exception as e:
+                    print(f"Purge callback failed: {e}")
+
+    def purge_leftovers(self):
+        """
+        Queues staged folders left by a previous run (app closed or
+        killed mid-purge). Call once at startup.
+
+        Returns:
+            number of folders queued
+        """
+        with _registry_lock:
+            roots = _load_registry()
+            alive = {r for r in roots if os.path.isdir(r)}
+            if alive != roots:
+                _save_registry(alive)
+
+        queued = 0
+        for root in alive:
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                self.submit(os.path.join(root, name))
+                queued += 1
+            if not names:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+
+        return queued
+
+
+# -------------------------------
+#  Shared purger
+# -------------------------------
+_purger = None
+_purger_lock = threading.Lock()
+
+
+def get_purger():
+    global _purger
+
+    with _purger_lock:
+        if _purger is None:
+            _purger = Purger()
+        return _purger
+
+
+def clean_instant(path, on_done=None):
+    """
+    Stage out path and queue the old contents for background purge.
+
+    Returns:
+        True if the folder was emptied instantly, False if it could not
+        be staged (nothing was queued; delete in place instead).
+    """
+    staged = stage_out(path)
+    if staged is None:
+        return False
+
+    get_purger().submit(staged, on_done)
+    return True
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import psutil
+
+
+# Limits used while throttling (game running or forced on)
+THROTTLED_OPS = 2000                 # file system operations per second
+THROTTLED_BYTES = 64 * 1024 * 1024   # bytes per second (deletes)
+
+# Processes that mean "a game is running on this machine"
+GAME_PROCESSES = {"fivem.exe", "gta5.exe"}
+
+# Seconds between two process-list checks in auto mode
+GAME_CHECK_INTERVAL = 5.0
+
+MODES = ("auto", "on", "off")
+
+
+# -------------------------------
+#  TOKEN BUCKET
+# -------------------------------
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most
+    `burst` (one second's worth by default).
+
+    take(n) costs one lock and a little arithmetic when tokens are
+    available; otherwise it sleeps just long enough, outside the lock.
+    A request larger than the bucket still goes through, it just waits
+    for the bucket to refill completely first (no deadlock).
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, n=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+
+                need = min(n, self.burst)
+                if self._tokens >= need:
+                    self._tokens -= n   # may go negative for oversized requests
+                    return
+                wait = (need - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class IOLimiter:
+    """
+    Ops/sec and bytes/sec limits for the scan and clean engines.
+    Either limit can be None (unlimited).
+    """
+
+    def __init__(self, ops_per_sec=THROTTLED_OPS, bytes_per_sec=THROTTLED_BYTES):
+        self.ops = TokenBucket(ops_per_sec) if ops_per_sec else None
+        self.bytes = TokenBucket(bytes_per_sec) if bytes_per_sec else None
+
+    def charge(self, ops=1, nbytes=0):
+        """
+        Blocks until `ops` operations moving `nbytes` bytes are allowed.
+        """
+        if self.ops and ops:
+            self.ops.take(ops)
+        if self.bytes and nbytes:
+            self.bytes.take(nbytes)
+
+
+# -------------------------------
+#  GAME DETECTION
+# -------------------------------
+def game_running():
+    """
+    True if FiveM or GTA V is running (psutil process scan).
+    """
+    for proc in psutil.process_iter(["name"]):
+        name = (proc.info.get("name") or "").lower()
+        if name in GAME_PROCESSES:
+            return True
+    return False
+
+
+class ThrottleControl:
+    """
+    Decides whether engines run throttled.
+
+    mode:
+        "auto"  throttle while FiveM / GTA V is running (checked at
+                most every GAME_CHECK_INTERVAL seconds)
+        "on"    always throttle
+        "off"   never throttle
+    """
+
+    def __init__(self, mode="auto", limiter=None):
+        self.mode = mode
+        self.limiter = limiter or IOLimiter()
+
+        self._lock = threading.Lock()
+        self._game = False
+        self._checked = 0.0
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Unknown throttle mode: {mode}")
+        self.mode = mode
+
+    def game_detected(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < GAME_CHECK_INTERVAL:
+                return self._game
+            self._checked = now
+
+        try:
+            running = game_running()
+        except psutil.Error as e:
+            print(f"Game detection failed: {e}")
+            running = False
+
+        with self._lock:
+            self._game = running
+        return running
+
+    def current(self):
+        """
+        The limiter engines should use right now, or None for full speed.
+        """
+        if self.mode == "off":
+            return None
+        if self.mode == "on" or self.game_detected():
+            return self.limiter
+        return None
+
+
+# -------------------------------
+#  Shared control
+# -------------------------------
+_control = ThrottleControl()
+
+
+def get_throttle():
+    return _control
+
+
+def current_limiter():
+    """
+    The limiter for a user-started scan or clean, resolved once when it
+    starts and passed down to the engines (game detection may run a
+    process sweep, so never call this per directory).
+    """
+    return _control.current()
@@ -1,49 +1,44 @@
 import os
+import queue
 import socket
 import shutil
 import subprocess
+import threading
+import time
 import requests
 
+from app.utils.scan_service import get_scan_service
+from app.utils.minidump import analyze_crashes, REPEAT_CRASHES
+
 
 def folder_exists(path):
     return os.path.exists(os.path.expandvars(path))
 
 
 def get_folder_size(path):
-    try:
-        total = 0
-        for root, _, files in os.walk(os.path.expandvars(path)):
-            for f in files:
-                fp = os.path.join(root, f)
-                total += os.path.getsize(fp)
-        return total
-    except:
-        return 0
-
-
-def run_all_checks():
-    """
-    Runs all diagnostics and returns a result dictionary.
-    Each item: { 'status': bool, 'message': str }
-    """
+    return get_scan_service().scan(os.path.expandvars(path)).result()["bytes"]
 
-    results = {}
 
-    # --------------------------------
-    # 1. FiveM Folder Check
-    # --------------------------------
+# --------------------------------
+# 1. FiveM Folder Check
+# --------------------------------
+def check_fivem_installation():
     fivem_path = r"%localappdata%\FiveM\FiveM.app"
     exists = folder_exists(fivem_path)
 
-    results["FiveM Installation"] = {
-        "status": exists,
-        "message": "FiveM installation folder located." if exists else
-                   "FiveM folder not found. Please ensure FiveM is installed."
+    return {
+        "FiveM Installation": {
+            "status": exists,
+            "message": "FiveM installation folder located." if exists else
+                       "FiveM folder not found. Please ensure FiveM is installed."
+        }
     }
 
-    # --------------------------------
-    # 2. GTA Shader Cache Check
-    # --------------------------------
+
+# --------------------------------
+# 2. GTA Shader Cache Check
+# --------------------------------
+def check_shader_cache():
     shader_path = r"%localappdata%\Rockstar Games\GTA V\Shaders"
     shader_exists = folder_exists(shader_path)
 
@@ -57,30 +52,38 @@ def run_all_checks():
     else:
         s_msg = "Shader folder missing. GTA V may not be installed correctly."
 
-    results["GTA Shader Cache"] = {
-        "status": shader_exists and not shader_large,
-        "message": s_msg
+    return {
+        "GTA Shader Cache": {
+            "status": shader_exists and not shader_large,
+            "message": s_msg
+        }
     }
 
-    # --------------------------------
-    # 3. Windows Temp Folder Size
-    # --------------------------------
+
+# --------------------------------
+# 3. Windows Temp Folder Size
+# --------------------------------
+def check_temp_folder():
     temp_path = r"%temp%"
     temp_size = get_folder_size(temp_path)
     temp_large = temp_size > (500 * 1024 * 1024)  # 500MB
 
-    results["Windows Temp Folder"] = {
-        "status": not temp_large,
-        "message": (
-            f"Temp folder size OK ({temp_size/1024/1024:.1f} MB)."
-            if not temp_large else
-            f"Temp folder very large ({temp_size/1024/1024:.1f} MB). Cleaning recommended."
-        )
+    return {
+        "Windows Temp Folder": {
+            "status": not temp_large,
+            "message": (
+                f"Temp folder size OK ({temp_size/1024/1024:.1f} MB)."
+                if not temp_large else
+                f"Temp folder very large ({temp_size/1024/1024:.1f} MB). Cleaning recommended."
+            )
+        }
     }
 
-    # --------------------------------
-    # 4. DNS Resolution Check
-    # --------------------------------
+
+# --------------------------------
+# 4. DNS Resolution Check
+# --------------------------------
+def check_dns():
     try:
         socket.gethostbyname("google.com")
         dns_ok = True
@@ -89,14 +92,18 @@ def run_all_checks():
         dns_ok = False
         dns_msg = "DNS resolution failed. Try using Flush DNS in Tools."
 
-    results["DNS Resolution"] = {
-        "status": dns_ok,
-        "message": dns_msg
+    return {
+        "DNS Resolution": {
+            "status": dns_ok,
+            "message": dns_msg
+        }
     }
 
-    # --------------------------------
-    # 5. Internet Connectivity
-    # --------------------------------
+
+# --------------------------------
+# 5. Internet Connectivity
+# --------------------------------
+def check_internet():
     try:
         requests.get("https://google.com", timeout=3)
         net_ok = True
@@ -105,53 +112,170 @@ def run_all_checks():
         net_ok = False
         net_msg = "Cannot reach the internet. Check your network."
 
-    results["Internet Connectivity"] = {
-        "status": net_ok,
-        "message": net_msg
+    return {
+        "Internet Connectivity": {
+            "status": net_ok,
+            "message": net_msg
+        }
     }
 
-    # --------------------------------
-    # 6. Disk Space
-    # --------------------------------
+
+# --------------------------------
+# 6. Disk Space
+# --------------------------------
+def check_disk_space():
     try:
         total, used, free = shutil.disk_usage("C:\\")
         low = free < (10 * 1024 * 1024 * 1024)  # < 10GB
-        results["Disk Space (C:)"] = {
-            "status": not low,
-            "message": (
-                f"Free space OK ({free/1024/1024/1024:.1f} GB free)."
-                if not low else
-                f"Low disk space ({free/1024/1024/1024:.1f} GB free). Clean-up recommended."
-            )
+        return {
+            "Disk Space (C:)": {
+                "status": not low,
+                "message": (
+                    f"Free space OK ({free/1024/1024/1024:.1f} GB free)."
+                    if not low else
+                    f"Low disk space ({free/1024/1024/1024:.1f} GB free). Clean-up recommended."
+                )
+            }
         }
     except:
-        results["Disk Space (C:)"] = {
-            "status": False,
-            "message": "Unable to check disk space."
+        return {
+            "Disk Space (C:)": {
+                "status": False,
+                "message": "Unable to check disk space."
+            }
         }
 
-    # --------------------------------
-    # 7. FiveM Crash Logs
-    # --------------------------------
-    logs_path = r"%localappdata%\FiveM\FiveM.app\crashes"
-    logs_exist = folder_exists(logs_path)
 
+# --------------------------------
+# 7. FiveM Crash Logs
+# --------------------------------
+CRASHES_PATH = r"%localappdata%\FiveM\FiveM.app\crashes"
+
+
+def check_crash_logs():
     log_files = 0
-    if logs_exist:
+    if folder_exists(CRASHES_PATH):
         try:
-            log_files = len(os.listdir(os.path.expandvars(logs_path)))
+            log_files = len(os.listdir(os.path.expandvars(CRASHES_PATH)))
         except:
             pass
 
     too_many_logs = log_files > 20
 
-    results["FiveM Crash Logs"] = {
-        "status": not too_many_logs,
-        "message": (
-            f"Crash log count OK ({log_files} files)."
-            if not too_many_logs else
-            f"High number of crash logs ({log_files}). Consider clearing them."
-        )
+    return {
+        "FiveM Crash Logs": {
+            "status": not too_many_logs,
+            "message": (
+                f"Crash log count OK ({log_files} files)."
+                if not too_many_logs else
+                f"High number of crash logs ({log_files}). Consider clearing them."
+            )
+        }
+    }
+
+
+# --------------------------------
+# 8. Top Crashing Modules (from the crash dumps)
+# --------------------------------
+def check_crash_modules():
+    crashes = None
+    if folder_exists(CRASHES_PATH):
+        try:
+            crashes = analyze_crashes(os.path.expandvars(CRASHES_PATH))
+        except:
+            pass
+
+    if crashes and crashes["modules"]:
+        top = crashes["modules"][:3]
+        listed = ", ".join(f"{name} ({count})" for name, count, _ in top)
+        repeat = top[0][1] >= REPEAT_CRASHES
+
+        return {
+            "Top Crashing Modules": {
+                "status": not repeat,
+                "message": (
+                    f"{crashes['dumps']} crash dumps, mostly in: {listed}."
+                    + (f" {top[0][0]} keeps crashing — check the resource or mod that uses it."
+                       if repeat else "")
+                )
+            }
+        }
+
+    return {
+        "Top Crashing Modules": {
+            "status": True,
+            "message": "No readable crash dumps found."
+        }
     }
 
-    return results
+
+# (result names, check, timeout in seconds), in report order
+CHECKS = [
+    (("FiveM Installation",), check_fivem_installation, 5),
+    (("GTA Shader Cache",), check_shader_cache, 30),
+    (("Windows Temp Folder",), check_temp_folder, 30),
+    (("DNS Resolution",), check_dns, 5),
+    (("Internet Connectivity",), check_internet, 8),
+    (("Disk Space (C:)",), check_disk_space, 5),
+    (("FiveM Crash Logs",), check_crash_logs, 5),
+    (("Top Crashing Modules",), check_crash_modules, 30),
+]
+
+
+def _run_check(i, check, done):
+    try:
+        done.put((i, check(), None))
+    except Exception as e:
+        done.put((i, None, e))
+
+
+def run_all_checks(on_result=None):
+    """
+    Runs all diagnostics and returns a result dictionary.
+    Each item: { 'status': bool, 'message': str }
+
+    The checks run at the same time, each on its own thread, so a slow
+    network doesn't hold up the folder checks. A check that hasn't
+    answered within its timeout is reported as failed (its thread is
+    left to finish in the background). on_result(name, result) is
+    called from this thread as each result comes in.
+    """
+    done = queue.Queue()
+    started = time.monotonic()
+    pending = {}
+    for i, (names, check, timeout) in enumerate(CHECKS):
+        threading.Thread(target=_run_check, args=(i, check, done), daemon=True).start()
+        pending[i] = started + timeout
+
+    found = {}
+
+    def report(i, results):
+        del pending[i]
+        for name in CHECKS[i][0]:
+            found[name] = results[name]
+            if on_result:
+                on_result(name, results[name])
+
+    while pending:
+        try:
+            i, results, error = done.get(timeout=max(0, min(pending.values()) - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for i in [i for i, deadline in pending.items() if deadline <= now]:
+                names, _, timeout = CHECKS[i]
+                report(i, {name: {
+                    "status": False,
+                    "message": f"Check timed out after {timeout}s."
+                } for name in names})
+            continue
+
+        if i not in pending:
+            continue
+        if error is not None:
+            results = {name: {
+                "status": False,
+                "message": f"Check failed: {error}"
+            } for name in CHECKS[i][0]}
+        report(i, results)
+
+    return {name: found[name] for names, _, _ in CHECKS for name in names}
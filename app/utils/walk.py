@@ -0,0 +1,94 @@
+import os
+import stat
+
+
+# -------------------------------
+#  LINKS
+# -------------------------------
+def is_link(entry):
+    """
+    True for symlinks and, on Windows, junctions and other reparse
+    points. These are listed as files and never entered: deleting
+    "inside" one would delete the folder it points to.
+    """
+    if entry.is_symlink():
+        return True
+    try:
+        attributes = entry.stat(follow_symlinks=False).st_file_attributes
+    except AttributeError:
+        return False  # not Windows
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+# -------------------------------
+#  TREE WALK
+# -------------------------------
+def walk_tree(root, token=None, on_error=None):
+    """
+    Lists the tree under root with os.scandir, one directory at a time,
+    depth first with an explicit stack.
+
+    Yields (directory, entries) in discovery order (parents before
+    children); entries are the DirEntry objects of the directory's
+    files, links included (see is_link). Sub-directories are not in
+    entries, they are yielded themselves later.
+
+    on_error (optional) is called with (path, OSError) for directories
+    that can't be listed and entries that can't be stat'ed; both are
+    left out. token (optional) is a CancelToken checked between
+    directories; check token.cancelled after the loop to tell a stopped
+    walk from a finished one.
+    """
+    stack = [root] if os.path.isdir(root) else []
+
+    while stack:
+        if token and token.cancelled:
+            return
+
+        current = stack.pop()
+        entries = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and not is_link(entry):
+                            stack.append(entry.path)
+                        else:
+                            entries.append(entry)
+                    except OSError as e:
+                        if on_error:
+                            on_error(entry.path, e)
+        except OSError as e:
+            if on_error:
+                on_error(current, e)
+            continue
+
+        yield current, entries
+
+
+
+
+# -------------------------------
+#  FILE LISTING
+# -------------------------------
+def list_files(root, suffix=None, token=None):
+    """
+    Regular files under root (links left out, see walk_tree), optionally
+    only names ending in suffix (case-insensitive). Unreadable folders
+    and entries are skipped.
+
+    Returns:
+        [(path, stat result)]
+    """
+    suffix = suffix.lower() if suffix else None
+    files = []
+    for _, entries in walk_tree(root, token):
+        for entry in entries:
+            if suffix and not entry.name.lower().endswith(suffix):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False) and not is_link(entry):
+                    files.append((entry.path, entry.stat(follow_symlinks=False)))
+            except OSError:
+                continue
+    return files
@@ -0,0 +1,458 @@
+import ctypes
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from app.utils.scanner import new_result, _scan_dir, TopN
+from app.utils.scan_index import (
+    get_index, scan_tree_indexed, largest_from_index, dump_top, RACY_WINDOW_NS
+)
+from app.utils.walk import walk_tree
+
+
+# -------------------------------------------------------------
+#  BACKENDS
+#
+#  A backend watches one root and calls on_dirty(dir_path) for every
+#  directory whose direct contents changed, or on_dirty(None) when it
+#  lost track (queue overflow, polling tick) and a rescan is needed.
+# -------------------------------------------------------------
+class WatchBackend:
+    """
+    Base class / interface for change watchers.
+    """
+
+    name = "base"
+
+    def __init__(self, root, on_dirty):
+        self.root = root
+        self.on_dirty = on_dirty
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        raise NotImplementedError
+
+
+class PollingBackend(WatchBackend):
+    """
+    Fallback: asks for an (index-assisted) rescan every `interval` seconds.
+    """
+
+    name = "polling"
+
+    def __init__(self, root, on_dirty, interval=30.0):
+        super().__init__(root, on_dirty)
+        self.interval = interval
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.on_dirty(None)
+
+
+class InotifyBackend(WatchBackend):
+    """
+    Linux inotify backend (one watch per directory, added as dirs appear).
+    Used for development / testing; Windows uses WindowsBackend.
+    """
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+
+    MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root, on_dirty):
+        super().__init__(root, on_dirty)
+
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths = {}  # watch descriptor -> directory
+        try:
+            self._add_tree(root)
+        except BaseException:
+            # The caller falls back to polling; don't leak the descriptor
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if path == self.root or err == 28:  # ENOSPC: out of watches
+                raise OSError(err, f"inotify_add_watch failed for {path}")
+            return
+        self.paths[wd] = path
+
+    def _add_tree(self, top):
+        # top first, so a missing root still fails loudly (see _add_watch);
+        # links are never followed (see walk_tree)
+        self._add_watch(top)
+        for current, _ in walk_tree(top):
+            if current != top:
+                self._add_watch(current)
+
+    def run(self):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    buf = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._parse(buf)
+        finally:
+            os.close(self.fd)
+
+    def _parse(self, buf):
+        offset = 0
+        while offset + self._EVENT.size <= len(buf):
+            wd, mask, _, length = self._EVENT.unpack_from(buf, offset)
+            name = buf[offset + self._EVENT.size: offset + self._EVENT.size + length]
+            offset += self._EVENT.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.on_dirty(None)
+                continue
+            if mask & self.IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+
+            parent = self.paths.get(wd)
+            if parent is None:
+                continue
+
+            if mask & self.IN_DELETE_SELF:
+                self.on_dirty(os.path.dirname(parent))
+                continue
+
+            self.on_dirty(parent)
+
+            # New sub-directory: start watching it too
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                child = os.path.join(parent, os.fsdecode(name.rstrip(b"\0")))
+                try:
+                    self._add_tree(child)
+                except OSError:
+                    self.on_dirty(None)
+
+
+class WindowsBackend(WatchBackend):
+    """
+    Windows change-notification backend: one ReadDirectoryChangesW call
+    on the root with bWatchSubtree=TRUE covers the whole tree.
+    """
+
+    name = "windows"
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+
+    NOTIFY_FILTER = (0x00000001     # FILE_NAME
+                     | 0x00000002   # DIR_NAME
+                     | 0x00000008   # SIZE
+                     | 0x00000010)  # LAST_WRITE
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, root, on_dirty):
+        super().__init__(root, on_dirty)
+
+        from ctypes import wintypes
+
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.kernel32.CreateFileW.restype = wintypes.HANDLE
+
+        self.handle = self.kernel32.CreateFileW(
+            root, self.FILE_LIST_DIRECTORY, self.FILE_SHARE_ALL, None,
+            self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS, None,
+        )
+        if self.handle in (None, wintypes.HANDLE(-1).value):
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def stop(self):
+        super().stop()
+        # Wakes the blocking ReadDirectoryChangesW call
+        self.kernel32.CancelIoEx(ctypes.c_void_p(self.handle), None)
+
+    def run(self):
+        from ctypes import wintypes
+
+        buf = ctypes.create_string_buffer(self.BUFFER_SIZE)
+        returned = wintypes.DWORD()
+
+        try:
+            while not self._stop.is_set():
+                ok = self.kernel32.ReadDirectoryChangesW(
+                    ctypes.c_void_p(self.handle), buf, self.BUFFER_SIZE, True,
+                    self.NOTIFY_FILTER, ctypes.byref(returned), None, None,
+                )
+                if not ok:
+                    break
+                if returned.value == 0:
+                    # Buffer overflowed, changes were dropped
+                    self.on_dirty(None)
+                    continue
+                self._parse(buf.raw[:returned.value])
+        finally:
+            self.kernel32.CloseHandle(ctypes.c_void_p(self.handle))
+
+    def _parse(self, data):
+        offset = 0
+        while True:
+            next_offset, _, length = struct.unpack_from("III", data, offset)
+            name = data[offset + 12: offset + 12 + length].decode("utf-16-le")
+            self.on_dirty(os.path.dirname(os.path.join(self.root, name)))
+
+            if next_offset == 0:
+                break
+            offset += next_offset
+
+
+def make_backend(root, on_dirty):
+    """
+    Native backend for this platform, or PollingBackend if it can't be set up.
+    """
+    try:
+        if sys.platform == "win32":
+            return WindowsBackend(root, on_dirty)
+        if sys.platform.startswith("linux"):
+            return InotifyBackend(root, on_dirty)
+    except (OSError, AttributeError) as e:
+        print(f"Native watcher unavailable for {root} ({e}); polling instead.")
+
+    return PollingBackend(root, on_dirty)
+
+
+# -------------------------------------------------------------
+#  WATCH SERVICE
+# -------------------------------------------------------------
+def _identity(path):
+    """
+    (st_dev, st_ino) of a directory, or None if it doesn't exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino) if os.path.isdir(path) else None
+
+
+class WatchService:
+    """
+    Keeps target sizes in the scan service current without full rescans.
+
+    Backends mark directories dirty; every `interval` seconds each dirty
+    directory is listed again (just that one directory) and the
+    difference against its scan index row is applied to the target's
+    totals, which are then published through the scan service.
+    New sub-directories are scanned, removed ones are subtracted
+    using their index rows.
+    """
+
+    def __init__(self, scan_service, interval=1.0, index=None):
+        self.service = scan_service
+        self.interval = interval
+        self.index = index or get_index()
+
+        self._lock = threading.Lock()
+        self._dirty = {}      # root -> set of dirs
+        self._rescan = set()  # roots that need an indexed rescan
+        self._backends = {}
+        self._identities = {}  # root -> (st_dev, st_ino) being watched
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.index is None or self._thread:
+            return
+
+        self._check_roots()
+
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            backends, self._backends = self._backends, {}
+        for backend in backends.values():
+            backend.stop()
+
+    def _check_roots(self):
+        """
+        (Re)starts backends for targets that appeared or were replaced
+        (e.g. renamed away by an instant clean and recreated empty), and
+        stops them for targets that are gone.
+        """
+        if self._stop.is_set():
+            return
+
+        for label in self.service.targets:
+            root = self.service.path_for(label)
+            current = _identity(root)
+
+            with self._lock:
+                if self._identities.get(root) == current:
+                    continue
+                self._identities[root] = current
+                old = self._backends.pop(root, None)
+                known = old is not None
+
+            if old:
+                old.stop()
+            if current is not None:
+                backend = make_backend(root, lambda d, r=root: self._mark(r, d))
+                backend.start()
+                with self._lock:
+                    self._backends[root] = backend
+            if known:
+                self._mark(root, None)
+
+    def backend_names(self):
+        return {root: b.name for root, b in self._backends.items()}
+
+    def _mark(self, root, directory):
+        with self._lock:
+            if directory is None:
+                self._rescan.add(root)
+            elif directory == root or directory.startswith(root.rstrip("\\/") + os.sep):
+                self._dirty.setdefault(root, set()).add(directory)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._check_roots()
+
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                rescan, self._rescan = self._rescan, set()
+
+            for root in rescan:
+                dirty.pop(root, None)
+                self.service.scan(root, max_age=0)
+
+            for root, dirs in dirty.items():
+                try:
+                    self._apply(root, dirs)
+                except Exception as e:
+                    print(f"Watcher update failed for {root}: {e}")
+
+    def _apply(self, root, dirs):
+        base = self.service.cached(root, max_age=float("inf"))
+        if base is None or base.get("partial"):
+            # No complete baseline yet; a normal scan will pick this up
+            return
+
+        result = dict(base)
+        for key, value in self._diff_dirs(dirs).items():
+            result[key] += value
+
+        if not os.path.isdir(root):
+            result = new_result(root)
+        else:
+            result["top_files"], result["top_dirs"] = largest_from_index(root, self.index)
+
+        self.service.publish(root, result)
+
+    def _diff_dirs(self, dirs):
+        """
+        Re-lists each dirty directory and returns the total change
+        { 'bytes', 'files', 'dirs', 'errors' } against the index.
+        """
+        delta = {"bytes": 0, "files": 0, "dirs": 0, "errors": 0}
+        now_ns = time.time_ns()
+        updates = []
+
+        # Parents first, so a new subtree is scanned once, by its parent
+        for current in sorted(dirs, key=len):
+            row = self.index.load_row(current)
+            if row is None:
+                continue
+
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                # Gone: its parent's listing accounts for the removal
+                continue
+
+            _, old_bytes, old_files, old_errors, old_children, _ = row
+            own = new_result(current)
+            own_top = TopN()
+            subdirs = []
+            _scan_dir(current, own, subdirs, top=own_top)
+
+            names = [os.path.basename(d) for d in subdirs]
+            old_names = json.loads(old_children)
+
+            delta["bytes"] += own["bytes"] - old_bytes
+            delta["files"] += own["files"] - old_files
+            delta["errors"] += own["errors"] - old_errors
+            delta["dirs"] += len(names) - len(old_names)
+
+            for gone in set(old_names) - set(names):
+                child = os.path.join(current, gone)
+                rows = self.index.load(child)
+                delta["bytes"] -= sum(r[1] for r in rows.values())
+                delta["files"] -= sum(r[2] for r in rows.values())
+                delta["errors"] -= sum(r[3] for r in rows.values())
+                delta["dirs"] -= sum(len(json.loads(r[4])) for r in rows.values())
+                self.index.delete_subtree(child)
+
+            for added in set(names) - set(old_names):
+                sub = scan_tree_indexed(os.path.join(current, added), self.index)
+                for key in delta:
+                    delta[key] += sub[key]
+
+            trusted = mtime_ns if now_ns - mtime_ns > RACY_WINDOW_NS else -1
+            updates.append((current, trusted, own["bytes"], own["files"],
+                            own["errors"], json.dumps(names), dump_top(own_top)))
+
+        self.index.save(updates, [])
+        return delta
+
+
+# -------------------------------
+#  Shared watcher
+# -------------------------------
+_watcher = None
+
+
+def get_watch_service():
+    global _watcher
+
+    if _watcher is None:
+        from app.utils.scan_service import get_scan_service
+        _watcher = WatchService(get_scan_service())
+    return _watcher
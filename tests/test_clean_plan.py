@@ -0,0 +1,39 @@
+import os
+import time
+
+from app.utils.clean_plan import build_plan, execute_target, record_clean
+from app.utils.scan_index import ScanIndex, scan_tree_indexed
+
+
+def _age(path, seconds):
+    when = time.time() - seconds
+    os.utime(path, (when, when))
+
+
+def test_file_added_after_plan_is_still_scanned(tmp_path):
+    root = tmp_path / "temp"
+    (root / "busy").mkdir(parents=True)
+    (root / "stale").mkdir()
+    (root / "stale" / "old.tmp").write_bytes(b"x" * 100)
+    _age(root / "stale" / "old.tmp", 3600)
+    # Just written, so the plan leaves it alone (in use)
+    (root / "busy" / "open.log").write_bytes(b"y" * 10)
+    for folder in (root / "busy", root / "stale", root):
+        _age(folder, 600)
+
+    index = ScanIndex(str(tmp_path / "index.db"))
+    scan_tree_indexed(str(root), index)
+
+    plan = build_plan({"Temp": str(root)})
+    target = plan.get("Temp")
+
+    # Written after the plan walk, long enough ago to look settled
+    (root / "busy" / "late.tmp").write_bytes(b"z" * 1000)
+    _age(root / "busy", 60)
+
+    result = execute_target(target)
+    record_clean(target, result, index)
+
+    scan = scan_tree_indexed(str(root), index)
+    assert scan["files"] == 2
+    assert scan["bytes"] == 1010
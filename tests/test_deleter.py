@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from app.utils import deleter
+
+
+def _make_outside(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.txt").write_text("keep me")
+    (outside / "sub").mkdir()
+    (outside / "sub" / "keep2.txt").write_text("keep me too")
+    return outside
+
+
+def _assert_outside_intact(outside):
+    assert (outside / "keep.txt").read_text() == "keep me"
+    assert (outside / "sub" / "keep2.txt").read_text() == "keep me too"
+
+
+def test_delete_tree_does_not_follow_symlinks(tmp_path):
+    outside = _make_outside(tmp_path)
+    root = tmp_path / "cache"
+    (root / "nested").mkdir(parents=True)
+    (root / "a.tmp").write_bytes(b"x" * 10)
+    (root / "nested" / "b.tmp").write_bytes(b"y" * 20)
+    try:
+        os.symlink(outside, root / "nested" / "dir_link", target_is_directory=True)
+        os.symlink(outside / "keep.txt", root / "file_link")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+
+    result = deleter.delete_tree(str(root))
+
+    _assert_outside_intact(outside)
+    assert os.listdir(root) == []
+    assert result["failed"]["other"] == 0
+
+
+@pytest.mark.skipif(os.name != "nt", reason="junctions are Windows only")
+def test_delete_tree_does_not_follow_junctions(tmp_path):
+    import _winapi
+
+    outside = _make_outside(tmp_path)
+    root = tmp_path / "temp"
+    root.mkdir()
+    (root / "a.tmp").write_bytes(b"x")
+    _winapi.CreateJunction(str(outside), str(root / "junction"))
+
+    deleter.delete_tree(str(root))
+
+    _assert_outside_intact(outside)
+    assert os.listdir(root) == []
+
+
+def test_flat_directory_is_split_into_batches(tmp_path):
+    root = tmp_path / "flat"
+    root.mkdir()
+    count = deleter.BATCH_FILES * 3 + 5
+    for i in range(count):
+        (root / f"{i}.tmp").write_bytes(b"z")
+
+    result = deleter.new_delete_result(str(root))
+    batches = list(deleter._walk_batches(str(root), result, []))
+
+    assert len(batches) == 4
+    assert all(len(batch) <= deleter.BATCH_FILES for batch in batches)
+    assert sum(len(batch) for batch in batches) == count
+
+    result = deleter.delete_tree(str(root))
+    assert result["files"] == count
+    assert os.listdir(root) == []
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from app.utils.scan_index import ScanIndex, scan_tree_indexed
+from app.utils.scanner import scan_tree
+from app.utils.walk import list_files
+
+
+def test_list_files_filters_suffix_and_skips_links(tmp_path):
+    (tmp_path / "crash" / "nested").mkdir(parents=True)
+    (tmp_path / "crash" / "a.DMP").write_bytes(b"x" * 10)
+    (tmp_path / "crash" / "nested" / "b.dmp").write_bytes(b"y" * 20)
+    (tmp_path / "crash" / "notes.txt").write_text("not a dump")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "c.dmp").write_bytes(b"z")
+    try:
+        os.symlink(outside, tmp_path / "crash" / "link", target_is_directory=True)
+        os.symlink(outside / "c.dmp", tmp_path / "crash" / "file_link.dmp")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+
+    found = dict(list_files(str(tmp_path / "crash"), ".dmp"))
+
+    assert sorted(os.path.basename(p) for p in found) == ["a.DMP", "b.dmp"]
+    assert found[str(tmp_path / "crash" / "nested" / "b.dmp")].st_size == 20
+
+
+def test_list_files_missing_root(tmp_path):
+    assert list_files(str(tmp_path / "missing")) == []
+
+
+def test_scan_tree_counts_links_without_entering_them(tmp_path):
+    root = tmp_path / "cache"
+    root.mkdir()
+    (root / "a.bin").write_bytes(b"x" * 10)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "big.bin").write_bytes(b"y" * 1000)
+    try:
+        os.symlink(outside, root / "link", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+
+    for scan in (scan_tree(str(root)), scan_tree(str(root), workers=2),
+                 scan_tree_indexed(str(root), ScanIndex(str(tmp_path / "index.db")))):
+        assert scan["dirs"] == 0
+        assert scan["files"] == 2
+        assert scan["bytes"] < 1000